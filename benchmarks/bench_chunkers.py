@@ -0,0 +1,90 @@
+"""
+Chunker scaling on large synthetic input: the previous splitters vs the
+line scanner (chunk_faq_text) and sentence-aware sliding windows.
+
+    python benchmarks/bench_chunkers.py --sizes 100000 1000000 4000000
+
+Cases per input size (characters):
+- faq: numbered FAQ text, old DOTALL regex vs line scanner (same output)
+- faq_flat: numbered clauses on one long line (PDF text without line
+  breaks), where the old regex re-scans to the end for every candidate
+- split: long unnumbered section, fixed max_chars slices vs token windows;
+  also reports how many chunks end mid-word / mid-sentence
+"""
+import argparse
+import json
+import re
+import time
+
+from synthetic import faq_text
+from rag_starterkit.rag.chunking import chunk_faq_text, sliding_window_chunks
+
+OLD_FAQ_PATTERN = re.compile(r"\n?\s*(\d+)\.\s+(.*?)\n(.*?)(?=\n\s*\d+\.|\Z)", re.DOTALL)
+OLD_TIMEOUT_CHARS = 100_000  # old regex on flat text is quadratic (~3 min at 400k); skip beyond this
+
+
+def old_faq(text: str) -> list:
+    return [m.groups() for m in OLD_FAQ_PATTERN.finditer(text)]
+
+
+def old_split(text: str, max_chars: int = 2200) -> list:
+    return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+
+def _prose(n_chars: int) -> str:
+    sentence = (
+        "The bank shall credit the proceeds of outstation cheques within the timelines "
+        "notified by RBI and pay interest at the savings rate for any delay. "
+    )
+    return (sentence * (n_chars // len(sentence) + 1))[:n_chars]
+
+
+def _time(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return round((time.perf_counter() - t0) * 1000, 1), out
+
+
+def _boundaries(chunks: list) -> dict:
+    mid_word = sum(1 for c in chunks[:-1] if c and not c[-1].isspace() and not c.rstrip().endswith("."))
+    mid_sentence = sum(1 for c in chunks[:-1] if not c.rstrip().endswith((".", "!", "?")))
+    return {"chunks": len(chunks), "mid_word_ends": mid_word, "mid_sentence_ends": mid_sentence}
+
+
+def run(size: int, chunk_tokens: int, overlap: int) -> dict:
+    row = {"chars": size}
+
+    faq = faq_text(size // 200)[:size]
+    old_ms, old = _time(old_faq, faq)
+    new_ms, new = _time(chunk_faq_text, faq)
+    row["faq"] = {"old_ms": old_ms, "new_ms": new_ms, "old_chunks": len(old), "new_chunks": len(new)}
+
+    flat = " ".join(f"{i}. Clause on cheque charges applies." for i in range(size // 36 + 1))[:size]
+    if size <= OLD_TIMEOUT_CHARS:
+        old_ms, _ = _time(old_faq, flat)
+    else:
+        old_ms = None
+    new_ms, _ = _time(chunk_faq_text, flat)
+    row["faq_flat"] = {"old_ms": old_ms, "new_ms": new_ms}
+
+    prose = _prose(size)
+    old_ms, old = _time(old_split, prose)
+    new_ms, new = _time(lambda t: list(sliding_window_chunks(t, chunk_tokens, overlap)), prose)
+    row["split"] = {
+        "old_ms": old_ms, "new_ms": new_ms,
+        "old": _boundaries(old), "new": _boundaries(new),
+    }
+    return row
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Chunker scaling benchmark")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100_000, 400_000, 2_000_000])
+    ap.add_argument("--chunk-tokens", type=int, default=320)
+    ap.add_argument("--overlap", type=int, default=48)
+    args = ap.parse_args()
+    print(json.dumps([run(s, args.chunk_tokens, args.overlap) for s in args.sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Embedding throughput / latency: direct `model.encode` per request vs the
+batching EmbeddingService, with optional background ingest load.
+
+    python benchmarks/bench_embeddings.py --stub              # no model download
+    python benchmarks/bench_embeddings.py --clients 16 --ingest
+
+The stub model charges a fixed per-call overhead plus a per-text cost and
+serialises calls on one lock, approximating a CPU-bound encoder that owns
+all cores.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from rag_starterkit.rag.embeddings import (
+    PRIORITY_INGEST,
+    PRIORITY_QUERY,
+    EmbeddingService,
+    get_embedding_model,
+)
+
+
+class StubModel:
+    def __init__(self, call_overhead_ms: float = 4.0, per_text_ms: float = 0.3, dim: int = 384):
+        self._overhead = call_overhead_ms / 1000.0
+        self._per_text = per_text_ms / 1000.0
+        self._dim = dim
+        self._lock = threading.Lock()
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, normalize_embeddings=False):
+        with self._lock:
+            time.sleep(self._overhead + self._per_text * len(texts))
+        return np.zeros((len(texts), self._dim), dtype=np.float32)
+
+
+def _pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100.0 * (len(xs) - 1))))] if xs else 0.0
+
+
+def _drive(embed_one, embed_bulk, clients: int, requests: int, ingest: bool) -> dict:
+    latencies, lock = [], threading.Lock()
+    stop = threading.Event()
+
+    def client(i):
+        for j in range(requests):
+            t0 = time.perf_counter()
+            embed_one(f"query {i}-{j} about cheque truncation")
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    def ingester():
+        while not stop.is_set():
+            embed_bulk([f"chunk {k} of a long policy section" for k in range(256)])
+
+    bg = threading.Thread(target=ingester, daemon=True) if ingest else None
+    if bg:
+        bg.start()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    stop.set()
+
+    return {
+        "queries": len(latencies),
+        "qps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_pct(latencies, 50), 2),
+        "p95_ms": round(_pct(latencies, 95), 2),
+        "p99_ms": round(_pct(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Embedding service benchmark")
+    ap.add_argument("--stub", action="store_true", help="use a stub model (no download)")
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=50)
+    ap.add_argument("--ingest", action="store_true", help="run background ingest load")
+    ap.add_argument("--max-batch", type=int, default=64)
+    ap.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    model = StubModel() if args.stub else get_embedding_model()
+    loader = lambda: model  # noqa: E731
+
+    direct = _drive(
+        lambda t: model.encode([t]),
+        lambda ts: model.encode(ts),
+        args.clients, args.requests, args.ingest,
+    )
+
+    svc = EmbeddingService(loader, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    batched = _drive(
+        lambda t: svc.encode([t], priority=PRIORITY_QUERY),
+        lambda ts: svc.encode(ts, priority=PRIORITY_INGEST),
+        args.clients, args.requests, args.ingest,
+    )
+
+    print(json.dumps({"direct": direct, "service": batched, "args": vars(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+End-to-end generate_answer latency per judge orchestration mode, against a
+stub Ollama (httpx.MockTransport) - no model server needed.
+
+    python benchmarks/bench_judge_modes.py --requests 16 --canned-rate 0.25
+
+Stub model: each endpoint serves one request at a time (like a single GPU
+model), generation emits tokens at a fixed rate, and the judge costs a fixed
+amount plus --judge-char-ms per character of the judged answer text.
+"separate-judge" points the judge at its own endpoint so judging stops
+queueing behind other requests' generations. Per-sentence (streaming) judging
+only pays off when judge time grows with the judged text; with a purely
+fixed judge cost it issues more judge calls for the same tail latency.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+from rag_starterkit.core.config import get_settings, override_settings
+from rag_starterkit.llm import ollama_client
+from rag_starterkit.rag import generator
+
+ANSWER = (
+    "Refunds can be requested within 14 days of purchase. "
+    "The service must not have been used. "
+    "Refunds are processed within 5-7 business days."
+)
+JUDGE_JSON = json.dumps({
+    "groundedness": 0.9, "confidence": 0.8, "hallucination_risk": "low", "unsupported_points": []
+})
+CONTEXTS = [{"id": "sample_policy.txt", "text": "Refund Policy: 14 days, 5-7 business days."}]
+
+
+class StubOllama:
+    def __init__(self, token_ms: float, judge_ms: float, judge_char_ms: float,
+                 canned_rate: float, seed: int = 7):
+        self.token_s = token_ms / 1000.0
+        self.judge_s = judge_ms / 1000.0
+        self.judge_char_s = judge_char_ms / 1000.0
+        self.canned_rate = canned_rate
+        self.rng = random.Random(seed)
+        self.servers: dict[str, asyncio.Lock] = {}
+        self.calls = {"generate": 0, "judge": 0}
+
+    def _server(self, host: str) -> asyncio.Lock:
+        return self.servers.setdefault(host, asyncio.Lock())
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        server = self._server(request.url.host)
+
+        if "strict banking compliance auditor" in body["prompt"]:
+            self.calls["judge"] += 1
+            async with server:
+                answer = body["prompt"].split("ANSWER:", 1)[-1].split("Return ONLY", 1)[0]
+                await asyncio.sleep(self.judge_s + self.judge_char_s * len(answer.strip()))
+            return httpx.Response(200, json={"response": JUDGE_JSON, "done": True})
+
+        self.calls["generate"] += 1
+        if self.rng.random() < self.canned_rate:
+            raise httpx.ReadTimeout("stub timeout", request=request)
+
+        tokens = [w + " " for w in ANSWER.split(" ")]
+        if not body.get("stream"):
+            async with server:
+                await asyncio.sleep(self.token_s * len(tokens))
+            return httpx.Response(200, json={"response": ANSWER, "done": True})
+
+        async def lines():
+            async with server:
+                for t in tokens:
+                    await asyncio.sleep(self.token_s)
+                    yield (json.dumps({"response": t, "done": False}) + "\n").encode()
+            yield (json.dumps({"response": "", "done": True}) + "\n").encode()
+
+        return httpx.Response(200, content=lines())
+
+
+async def _run_mode(mode: str, n: int, stub: StubOllama, separate_judge: bool) -> dict:
+    ollama_client._client = httpx.AsyncClient(transport=httpx.MockTransport(stub.handler))
+    ollama_client._client_loop = asyncio.get_running_loop()
+    judge_url = "http://judge:11434/api/generate" if separate_judge else get_settings().ollama_url
+
+    async def one():
+        t0 = time.perf_counter()
+        await generator.generate_answer("How long do refunds take?", CONTEXTS, mode=mode)
+        return (time.perf_counter() - t0) * 1000
+
+    with override_settings(judge_url=judge_url):
+        t0 = time.perf_counter()
+        lat = await asyncio.gather(*(one() for _ in range(n)))
+        wall = time.perf_counter() - t0
+    lat = sorted(lat)
+    return {
+        "mean_ms": round(statistics.fmean(lat), 1),
+        "p95_ms": round(lat[int(0.95 * (len(lat) - 1))], 1),
+        "wall_s": round(wall, 2),
+        "llm_calls": dict(stub.calls),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Judge orchestration benchmark (stub LLM)")
+    ap.add_argument("--requests", type=int, default=16)
+    ap.add_argument("--token-ms", type=float, default=5.0)
+    ap.add_argument("--judge-ms", type=float, default=60.0)
+    ap.add_argument("--judge-char-ms", type=float, default=0.0)
+    ap.add_argument("--canned-rate", type=float, default=0.25)
+    args = ap.parse_args()
+
+    scenarios = [
+        ("sequential", False),
+        ("skip_canned", False),
+        ("streaming", False),
+        ("skip_canned", True),
+        ("streaming", True),
+    ]
+    out = {}
+    for mode, separate in scenarios:
+        stub = StubOllama(args.token_ms, args.judge_ms, args.judge_char_ms, args.canned_rate)
+        name = f"{mode}{' +separate-judge' if separate else ''}"
+        out[name] = asyncio.run(_run_mode(mode, args.requests, stub, separate))
+    print(json.dumps({"results": out, "args": vars(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
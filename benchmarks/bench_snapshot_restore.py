@@ -0,0 +1,105 @@
+"""
+Replica bootstrap: snapshot restore vs re-ingest (re-embedding every chunk).
+
+    python benchmarks/bench_snapshot_restore.py --chunks 20000
+    python benchmarks/bench_snapshot_restore.py --chunks 5000 --per-text-ms 2
+
+Everything runs in a temporary directory with synthetic chunks and random
+384-d vectors. The re-ingest baseline embeds through the batching
+EmbeddingService with a stub encoder charging --per-text-ms per chunk
+(the PDF parsing a real re-ingest also pays is not included). "Serving"
+time is restore plus the first query against the new replica.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+from bench_embeddings import StubModel
+from rag_starterkit.rag import provenance, snapshot, vectorstore
+from rag_starterkit.rag.embeddings import EmbeddingService
+from rag_starterkit.rag.shards import ShardManager
+
+DIM = 384
+
+
+def _use_store(root: str) -> None:
+    client = chromadb.PersistentClient(path=os.path.join(root, ".chroma"))
+    vectorstore._client = client
+    vectorstore._shards = ShardManager(client)
+    provenance._store = provenance.ProvenanceStore(os.path.join(root, ".provenance"))
+
+
+def _synthetic(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ids = [f"chunk-{i:07d}" for i in range(n)]
+    texts = [
+        f"Section {i % 97}.{i % 13}: charges for cheque return, refund timelines and "
+        f"grievance escalation apply to account class {i % 7}. Clause {i}."
+        for i in range(n)
+    ]
+    metas = [
+        {"doc_id": f"doc-{i // 500}", "page_start": i % 300 + 1, "page_end": i % 300 + 2,
+         "source_path": f"docs/doc-{i // 500}.pdf", "title_path": f"Part {i % 5} > Section {i % 97}"}
+        for i in range(n)
+    ]
+    vecs = rng.normal(size=(n, DIM)).astype(np.float32)
+    return ids, texts, metas, vecs
+
+
+def _dir_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(path) for f in fs)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Snapshot restore benchmark")
+    ap.add_argument("--chunks", type=int, default=20000)
+    ap.add_argument("--part-rows", type=int, default=snapshot.PART_ROWS)
+    ap.add_argument("--per-text-ms", type=float, default=1.0)
+    ap.add_argument("--skip-reembed", action="store_true")
+    args = ap.parse_args()
+
+    ids, texts, metas, vecs = _synthetic(args.chunks)
+    query_vec = vecs[0]
+    vectorstore.embed_query = lambda q: query_vec
+    report = {"chunks": args.chunks, "dim": DIM}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _use_store(os.path.join(tmp, "source"))
+        vectorstore.bulk_upsert(ids, texts, metas, vecs, tenant="bench")
+
+        snap = os.path.join(tmp, "snap")
+        t0 = time.perf_counter()
+        snapshot.export_snapshot(snap, ["bench"], part_rows=args.part_rows)
+        report["export_s"] = round(time.perf_counter() - t0, 2)
+        report["snapshot_mb"] = round(_dir_bytes(snap) / 1e6, 1)
+
+        _use_store(os.path.join(tmp, "replica"))
+        t0 = time.perf_counter()
+        snapshot.import_snapshot(snap)
+        report["restore_s"] = round(time.perf_counter() - t0, 2)
+        assert vectorstore.query_documents("q", top_k=4, tenant="bench")
+        report["restore_to_serving_s"] = round(time.perf_counter() - t0, 2)
+        report["restore_rows_per_s"] = round(args.chunks / report["restore_s"])
+
+        if not args.skip_reembed:
+            service = EmbeddingService(model_loader=lambda m=StubModel(per_text_ms=args.per_text_ms, dim=DIM): m)
+            vectorstore.embed_texts = lambda t, priority=None: service.encode(t)
+            _use_store(os.path.join(tmp, "reingest"))
+            docs = [{"id": i, "text": t, "metadata": m} for i, t, m in zip(ids, texts, metas)]
+            t0 = time.perf_counter()
+            for i in range(0, len(docs), 256):
+                vectorstore.add_documents(docs[i:i + 256], tenant="bench", dedup=False)
+            report["reingest_s"] = round(time.perf_counter() - t0, 2)
+            report["per_text_ms"] = args.per_text_ms
+            report["speedup"] = round(report["reingest_s"] / report["restore_s"], 1)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare a benchmark result against a stored baseline.
+
+    python benchmarks/compare_baseline.py /tmp/micro.json benchmarks/baselines/micro.json
+    python benchmarks/compare_baseline.py /tmp/load.json benchmarks/baselines/load_query.json --tolerance 0.5
+    python benchmarks/compare_baseline.py --summarize /tmp/micro.json benchmarks/baselines/micro.json
+
+Understands pytest-benchmark JSON (median seconds per test, lower is better)
+and load_query.py output (rps higher is better, latency percentiles lower).
+Exits 1 if any metric is worse than the baseline by more than --tolerance.
+--summarize stores pytest-benchmark output as a baseline with only the
+per-benchmark mean/median (no machine_info or per-round data).
+"""
+import argparse
+import json
+from typing import Dict, List, Tuple
+
+
+def metrics_of(result: Dict) -> Dict[str, Tuple[float, bool]]:
+    """
+    {metric: (value, higher_is_better)}
+    """
+    if "benchmarks" in result:  # pytest-benchmark
+        return {b["fullname"]: (b["stats"]["median"], False) for b in result["benchmarks"]}
+    return {k: (v, k == "rps") for k, v in result.get("metrics", {}).items()}
+
+
+def summarize(result: Dict) -> Dict:
+    return {
+        "benchmarks": [
+            {"fullname": b["fullname"], "stats": {k: b["stats"][k] for k in ("mean", "median")}}
+            for b in result["benchmarks"]
+        ],
+        "datetime": result.get("datetime"),
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.3) -> List[Dict]:
+    cur, base = metrics_of(current), metrics_of(baseline)
+    rows = []
+    for name in sorted(set(cur) & set(base)):
+        (c, higher_better), (b, _) = cur[name], base[name]
+        change = (c - b) / b if b else 0.0
+        worse = -change if higher_better else change
+        rows.append({"metric": name, "baseline": b, "current": c, "change": change, "regressed": worse > tolerance})
+    return rows
+
+
+def print_comparison(rows: List[Dict]) -> bool:
+    """
+    Print a table; returns True if anything regressed.
+    """
+    width = max([len(r["metric"]) for r in rows] + [6])
+    for r in rows:
+        flag = "REGRESSED" if r["regressed"] else ""
+        print(f"{r['metric']:<{width}}  {r['baseline']:>12.6g}  {r['current']:>12.6g}  {r['change']:>+8.1%}  {flag}")
+    return any(r["regressed"] for r in rows)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare benchmark output with a baseline")
+    ap.add_argument("current")
+    ap.add_argument("baseline")
+    ap.add_argument("--tolerance", type=float, default=0.3)
+    ap.add_argument("--summarize", action="store_true", help="Write `current` to `baseline` as a summary")
+    args = ap.parse_args()
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    if args.summarize:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(summarize(current), f, indent=2)
+            f.write("\n")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if print_comparison(compare(current, baseline, args.tolerance)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import pytest
+
+from synthetic import hash_embed, seed_store
+
+
+@pytest.fixture(scope="session")
+def bench_store(tmp_path_factory):
+    """
+    A 5k-chunk tenant shard with stub embeddings; queries are embedded with
+    the same stub so no model download is needed.
+    """
+    from rag_starterkit.rag import vectorstore
+
+    seed_store(str(tmp_path_factory.mktemp("store")), 5000)
+    mp = pytest.MonkeyPatch()
+    mp.setattr(vectorstore, "embed_query", lambda q: hash_embed([q])[0])
+    yield vectorstore
+    mp.undo()
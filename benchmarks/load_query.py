@@ -0,0 +1,121 @@
+"""
+Closed-loop load generator for POST /v1/query, fully local.
+
+    python benchmarks/load_query.py --concurrency 16 --requests 400
+    python benchmarks/load_query.py --save benchmarks/baselines/load_query.json
+    python benchmarks/load_query.py --compare benchmarks/baselines/load_query.json
+
+The FastAPI app runs in-process (httpx ASGITransport). Ollama is a stub
+(httpx.MockTransport) with fixed generation/judge latencies, query
+embeddings come from a hash stub, and the vector store is a temporary
+Chroma shard of synthetic chunks. What is measured is this service's own
+overhead under concurrency: admission control, retrieval, prompt building,
+citations and the judge round-trip.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from compare_baseline import compare, print_comparison
+from synthetic import hash_embed, seed_store
+from rag_starterkit.llm import ollama_client
+from rag_starterkit.main import app
+from rag_starterkit.rag import vectorstore
+
+JUDGE_JSON = json.dumps({
+    "groundedness": 0.9, "confidence": 0.8, "hallucination_risk": "low", "unsupported_points": []
+})
+
+
+def _stub_ollama(llm_ms: float, judge_ms: float):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if "strict banking compliance auditor" in body["prompt"]:
+            await asyncio.sleep(judge_ms / 1000.0)
+            return httpx.Response(200, json={"response": JUDGE_JSON, "done": True})
+        await asyncio.sleep(llm_ms / 1000.0)
+        return httpx.Response(200, json={"response": "Charges apply as per the schedule.", "done": True})
+
+    return handler
+
+
+def _pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100.0 * (len(xs) - 1))))] if xs else 0.0
+
+
+async def _drive(args) -> dict:
+    ollama_client._client = httpx.AsyncClient(transport=httpx.MockTransport(_stub_ollama(args.llm_ms, args.judge_ms)))
+    ollama_client._client_loop = asyncio.get_running_loop()
+
+    queries = [f"charges for cheque dishonour case {i}" for i in range(args.distinct)]
+    latencies, statuses = [], Counter()
+    counter = iter(range(args.requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            for i in counter:
+                t0 = time.perf_counter()
+                r = await client.post("/v1/query", json={"query": queries[i % len(queries)], "tenant": "bench"})
+                latencies.append((time.perf_counter() - t0) * 1000)
+                statuses[r.status_code] += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    ok = statuses.get(200, 0)
+    return {
+        "benchmark": "load_query",
+        "config": {
+            "concurrency": args.concurrency, "requests": args.requests, "distinct_queries": args.distinct,
+            "chunks": args.chunks, "llm_ms": args.llm_ms, "judge_ms": args.judge_ms,
+        },
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "metrics": {
+            "rps": round(ok / elapsed, 1),
+            "p50_ms": round(_pct(latencies, 50), 2),
+            "p95_ms": round(_pct(latencies, 95), 2),
+            "p99_ms": round(_pct(latencies, 99), 2),
+        },
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local /v1/query load generator (stub LLM + embeddings)")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--distinct", type=int, default=50, help="Distinct query strings (cache hit mix)")
+    ap.add_argument("--chunks", type=int, default=2000)
+    ap.add_argument("--llm-ms", type=float, default=50.0)
+    ap.add_argument("--judge-ms", type=float, default=20.0)
+    ap.add_argument("--save", help="Write the result as a baseline JSON")
+    ap.add_argument("--compare", help="Baseline JSON to compare against (exit 1 on regression)")
+    ap.add_argument("--tolerance", type=float, default=0.3)
+    args = ap.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_store(tmp, args.chunks)
+        vectorstore.embed_query = lambda q: hash_embed([q])[0]
+        report = asyncio.run(_drive(args))
+
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            rows = compare(report, json.load(f), args.tolerance)
+        if print_comparison(rows):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Deterministic synthetic inputs and stubs shared by the benchmark suite.
+"""
+import os
+import zlib
+
+import chromadb
+import numpy as np
+
+from rag_starterkit.ingest.pdf_loader import Page
+
+DIM = 384
+
+_TOPICS = [
+    "cheque truncation system (CTS) clearing",
+    "dishonour of cheques and return memo charges",
+    "outstation cheque collection and OMC",
+    "immediate credit before realization",
+    "Positive Pay (PPS) confirmation",
+    "compensation for delayed collection under RBI circular",
+    "Negotiable Instruments Act obligations",
+]
+
+
+def hash_embed(texts, dim: int = DIM) -> np.ndarray:
+    """
+    Stub embedding: unit vectors seeded from a CRC of the text (stable across runs).
+    """
+    out = np.empty((len(texts), dim), dtype=np.float32)
+    for i, t in enumerate(texts):
+        v = np.random.default_rng(zlib.crc32(t.encode("utf-8"))).standard_normal(dim)
+        out[i] = v / np.linalg.norm(v)
+    return out
+
+
+def faq_text(n_questions: int) -> str:
+    lines = ["Frequently Asked Questions", ""]
+    for i in range(1, n_questions + 1):
+        topic = _TOPICS[i % len(_TOPICS)]
+        lines.append(f"{i}. What are the rules for {topic} in case {i}?")
+        lines.append(
+            f"The bank follows the policy on {topic}. Customers are informed within {i % 9 + 2} "
+            "working days and charges are levied as per the schedule of charges."
+        )
+        lines.append("Further details are available at the branch.")
+    return "\n".join(lines)
+
+
+def policy_pages(n_pages: int, sections_per_page: int = 2) -> list[Page]:
+    """
+    Pages of a numbered policy document: "N Title" / "N.M Title" headings
+    followed by body paragraphs, with running headers that must be ignored.
+    """
+    pages, sec = [], 0
+    for p in range(1, n_pages + 1):
+        lines = ["Cheque Collection Policy", f"Page | {p}"]
+        for _ in range(sections_per_page):
+            sec += 1
+            major, minor = sec // 4 + 1, sec % 4
+            topic = _TOPICS[sec % len(_TOPICS)]
+            heading = f"{major} General provisions on {topic}" if minor == 0 else f"{major}.{minor} Procedure for {topic}"
+            lines.append(heading)
+            for k in range(6):
+                lines.append(
+                    f"({chr(97 + k)}) The bank shall handle {topic} as per RBI circular dated 2010 "
+                    f"and credit the customer within {k + 2} days; dishonour attracts charges."
+                )
+        pages.append(Page(page_num=p, text="\n".join(lines)))
+    return pages
+
+
+def relation_chunks(n: int) -> list[dict]:
+    return [
+        {
+            "chunk_id": f"c{i}",
+            "doc_id": f"doc{i % 5}",
+            "text": f"Section {i}: policy on {_TOPICS[i % len(_TOPICS)]}.",
+            "concept_tags": ["CTS", "DISHONOUR"][: i % 3],
+        }
+        for i in range(n)
+    ]
+
+
+def seed_store(root: str, n_chunks: int, tenant: str = "bench"):
+    """
+    Point the vector store and provenance store at `root` and load
+    `n_chunks` synthetic chunks with stub embeddings (no model needed).
+    """
+    from rag_starterkit.rag import provenance, vectorstore
+    from rag_starterkit.rag.shards import ShardManager
+
+    client = chromadb.PersistentClient(path=os.path.join(root, ".chroma"))
+    vectorstore._client = client
+    vectorstore._shards = ShardManager(client)
+    provenance._store = provenance.ProvenanceStore(os.path.join(root, ".provenance"))
+
+    texts = [
+        f"Q{i}: What is the procedure for {_TOPICS[i % len(_TOPICS)]} (case {i})?\n"
+        f"A: Charges and timelines for {_TOPICS[(i * 3) % len(_TOPICS)]} apply."
+        for i in range(n_chunks)
+    ]
+    ids = [f"chunk-{i:06d}" for i in range(n_chunks)]
+    metas = [
+        {"doc_id": f"doc-{i % 20}", "bank": ("sbi", "hdfc", "icici")[i % 3], "page_start": i % 50 + 1,
+         "page_end": i % 50 + 1, "source_path": f"docs/doc-{i % 20}.pdf"}
+        for i in range(n_chunks)
+    ]
+    vectorstore.bulk_upsert(ids, texts, metas, hash_embed(texts), tenant=tenant)
+    return ids, texts
@@ -0,0 +1,76 @@
+"""
+Micro-benchmarks for ingest and retrieval stages (pytest-benchmark).
+
+    pytest benchmarks --benchmark-only --benchmark-json=/tmp/micro.json
+    python benchmarks/compare_baseline.py /tmp/micro.json benchmarks/baselines/micro.json
+
+Inputs are synthetic and deterministic (benchmarks/synthetic.py); embeddings
+are stubbed, so numbers measure this repo's code plus Chroma, not the model.
+"""
+import pytest
+
+from synthetic import faq_text, hash_embed, policy_pages, relation_chunks
+from rag_starterkit.core.config import override_settings
+from rag_starterkit.ingest import relations_builder
+from rag_starterkit.ingest.concept_tagger import tag_concepts
+from rag_starterkit.ingest.heading_detector import detect_headings
+from rag_starterkit.ingest.hierarchy_builder import build_tree
+from rag_starterkit.ingest.leaf_chunker import leaf_chunks_from_tree
+from rag_starterkit.rag.chunking import chunk_faq_text, sliding_window_chunks
+
+FAQ = faq_text(500)
+PAGES = policy_pages(100)
+
+
+def test_chunk_faq_text(benchmark):
+    chunks = benchmark(chunk_faq_text, FAQ)
+    assert len(chunks) == 500
+
+
+def test_sliding_window_chunks(benchmark):
+    text = " ".join(p.text for p in PAGES)
+    windows = benchmark(lambda: list(sliding_window_chunks(text, 320, 48)))
+    assert windows
+
+
+def test_detect_headings(benchmark):
+    toc = benchmark(detect_headings, PAGES)
+    assert toc
+
+
+def test_leaf_chunks_from_tree(benchmark):
+    root = build_tree(detect_headings(PAGES))
+    chunks = benchmark(
+        leaf_chunks_from_tree,
+        pages=PAGES, doc_id="bench", source_path="bench.pdf", root=root, doc_last_page=len(PAGES),
+    )
+    assert chunks
+
+
+def test_tag_concepts(benchmark):
+    texts = [p.text for p in PAGES]
+    tags = benchmark(lambda: [tag_concepts(t) for t in texts])
+    assert any(tags)
+
+
+def test_build_relations(benchmark, monkeypatch, tmp_path):
+    monkeypatch.setattr(relations_builder, "embed_texts", hash_embed)
+    chunks = relation_chunks(300)
+    rel = benchmark(relations_builder.build_relations, chunks, str(tmp_path / "rel.json"))
+    assert rel["concept_edges"]
+
+
+@pytest.mark.parametrize("mode", ["plain", "mmr", "filtered", "filtered_ids"])
+def test_query_documents(benchmark, bench_store, mode):
+    kwargs = {"tenant": "bench", "top_k": 4, "mmr_lambda": 1.0}
+    if mode == "mmr":
+        kwargs["mmr_lambda"] = 0.7
+    elif mode.startswith("filtered"):
+        kwargs["filters"] = {"bank": "sbi", "page_from": 10, "page_to": 20}
+    # filtered: default exact path; filtered_ids: Chroma restricted to candidate ids
+    prefilter = 0 if mode == "filtered_ids" else 2000
+    with override_settings(prefilter_max_candidates=prefilter):
+        bench_store._shards.get("bench").index_loaded = False  # rebuild with/without vectors
+        bench_store.query_documents("warm-up", **kwargs)  # index build is not part of the query
+        hits = benchmark(bench_store.query_documents, "charges for cheque dishonour", **kwargs)
+    assert len(hits) == 4
@@ -1,24 +1,70 @@
-from fastapi import APIRouter
-from rag_starterkit.rag.retriever import retrieve_context
-from rag_starterkit.rag.vectorstore import peek_documents
+from fastapi import APIRouter, HTTPException, Path, Query
+from rag_starterkit.api.schemas import TENANT_PATTERN
+from rag_starterkit.core.concurrency import query_admission, run_in_executor, search_executor
+from rag_starterkit.core.config import get_settings, reload_settings, update_settings
+from rag_starterkit.core.metrics import counters
+from rag_starterkit.rag.embeddings import query_cache
+from rag_starterkit.rag.generator import build_citations
+from rag_starterkit.rag.retriever import aretrieve_context
+from rag_starterkit.rag.vectorstore import peek_documents, shard_stats, unload_shard
 
 debug_router = APIRouter()
 @debug_router.get("/v1/debug/peek")
-def debug_peek(n: int = 3):
-    docs = peek_documents(n=n)
+def debug_peek(n: int = 3, tenant: str | None = Query(None, pattern=TENANT_PATTERN)):
+    docs = peek_documents(n=n, tenant=tenant)
     return {
         "n": n,
         "results": [{"id": d["id"], "snippet": (d["text"] or "")[:400]} for d in docs],
     }
 @debug_router.get("/v1/debug/retrieve")
-def debug_retrieve(q: str, top_k: int = 3):
-    contexts = retrieve_context(q, top_k=top_k)
+async def debug_retrieve(q: str, top_k: int = 3, tenant: str | None = Query(None, pattern=TENANT_PATTERN)):
+    contexts = await aretrieve_context(q, top_k=top_k, tenant=tenant)
+    citations = await run_in_executor(search_executor, build_citations, q, contexts)
     return {
         "query": q,
         "top_k": top_k,
         "hits": len(contexts),
         "results": [
-            {"id": c["id"], "snippet": (c["text"] or "")[:300]}
-            for c in contexts
+            {
+                "id": c.source_id,
+                "snippet": c.snippet,
+                "page_start": c.page_start,
+                "page_end": c.page_end,
+                "title_path": c.title_path,
+                "score": c.score,
+            }
+            for c in citations
         ],
     }
+@debug_router.get("/v1/debug/shards")
+def debug_shards():
+    return {"shards": shard_stats()}
+@debug_router.post("/v1/debug/shards/{tenant}/unload")
+def debug_unload_shard(tenant: str = Path(..., pattern=TENANT_PATTERN)):
+    return {"tenant": tenant, "unloaded": unload_shard(tenant)}
+@debug_router.get("/v1/debug/admission")
+def debug_admission():
+    return query_admission.stats()
+@debug_router.get("/v1/debug/metrics")
+def debug_metrics():
+    snap = counters.snapshot()
+    attempts = snap.get("judge_requests", 0) + snap.get("judge_retries", 0)
+    return {
+        "counters": snap,
+        "judge_parse_failure_rate": (snap.get("judge_parse_failures", 0) / attempts) if attempts else 0.0,
+        "query_embedding_cache": query_cache.stats(),
+    }
+@debug_router.get("/v1/debug/config")
+def debug_config():
+    return get_settings().model_dump()
+@debug_router.post("/v1/debug/config/reload")
+def debug_config_reload(changes: dict | None = None):
+    """
+    Re-read env/env file, or apply `changes` (reloadable knobs only) directly.
+    """
+    if changes:
+        try:
+            return {"applied": update_settings(**changes), "restart_required": []}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return reload_settings()
@@ -1,26 +1,52 @@
-from fastapi import APIRouter
+import asyncio
+from fastapi import APIRouter, HTTPException
 from rag_starterkit.api.schemas import IngestRequest, QueryRequest, QueryResponse
+from rag_starterkit.core.concurrency import Overloaded, query_admission
+from rag_starterkit.core.config import get_settings
+from rag_starterkit.core.metrics import counters, reasks
+from rag_starterkit.llm.qwen_judge import JUDGE_FAILURE_POINT
 from rag_starterkit.data.ingest import ingest_path
-from rag_starterkit.rag.retriever import retrieve_context
+from rag_starterkit.rag.retriever import aretrieve_context
 from rag_starterkit.rag.generator import generate_answer
 
 router = APIRouter()
 
 @router.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 @router.post("/v1/ingest")
 def ingest(req: IngestRequest):
-    result = ingest_path(req.path)
+    result = ingest_path(req.path, mode=req.mode, bank=req.bank, tenant=req.tenant)
     return {"ingested": result}
 
-@router.post("/v1/query", response_model=QueryResponse)
-def query(req: QueryRequest):
-    contexts = retrieve_context(req.query, top_k=req.top_k)
-    answer, citations, quality = generate_answer(req.query, contexts)
+async def _answer(req: QueryRequest) -> QueryResponse:
+    reasks.observe(req.query)
+    async with query_admission:
+        filters = req.filters.model_dump(exclude_none=True) if req.filters else None
+        contexts = await aretrieve_context(
+            req.query, top_k=req.top_k, filters=filters, tenant=req.tenant, tenants=req.tenants,
+            mmr_lambda=req.mmr_lambda, adaptive=req.adaptive,
+        )
+        if not contexts:
+            counters.inc("no_context_refusals")
+        answer, citations, quality = await generate_answer(req.query, contexts)
+    if quality is not None and quality.rejected:
+        counters.inc("answers_rejected")
+        reasks.record_rejection(req.query, judge_failed=JUDGE_FAILURE_POINT in quality.unsupported_points)
     return QueryResponse(
         answer=answer,
         citations=citations,
         quality=quality
     )
+
+@router.post("/v1/query", response_model=QueryResponse)
+async def query(req: QueryRequest):
+    # The deadline covers queue wait, retrieval, generation and judge; on expiry
+    # the in-flight Ollama request is cancelled and queued executor work is dropped.
+    try:
+        return await asyncio.wait_for(_answer(req), timeout=get_settings().query_deadline_s)
+    except Overloaded:
+        raise HTTPException(status_code=429, detail="Too many queued queries", headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Query deadline exceeded")
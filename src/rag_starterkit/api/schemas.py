@@ -1,16 +1,58 @@
-from pydantic import BaseModel, Field
-from typing import List,Literal
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, List, Literal
+
+from rag_starterkit.core.config import get_settings
+
+TENANT_PATTERN = r"^[A-Za-z0-9_-]{1,40}$"
 
 class IngestRequest(BaseModel):
     path: str = Field(..., description="Local folder path containing documents to ingest.")
+    mode: Literal["faq", "hierarchical"] = Field(
+        "faq", description="PDF chunking: FAQ question/answer or TOC/heading leaf chunks."
+    )
+    bank: str | None = Field(None, description="Bank label stored on every ingested chunk.")
+    tenant: str | None = Field(
+        None, pattern=TENANT_PATTERN, description="Tenant/domain shard to ingest into."
+    )
+
+class QueryFilters(BaseModel):
+    doc_id: str | None = None
+    bank: str | None = None
+    section_type: Literal["policy", "annexure"] | None = None
+    policy_topic: str | None = None
+    concept_tags: list[str] = Field(default_factory=list, description="All tags must match.")
+    page_from: int | None = Field(None, ge=1)
+    page_to: int | None = Field(None, ge=1)
 
 class QueryRequest(BaseModel):
     query: str
-    top_k: int = 4
+    top_k: int = Field(default_factory=lambda: get_settings().default_top_k, ge=1)
+    filters: QueryFilters | None = None
+    tenant: str | None = Field(None, pattern=TENANT_PATTERN)
+    tenants: list[Annotated[str, Field(pattern=r"^(\*|[A-Za-z0-9_-]{1,40})$")]] | None = Field(
+        None, description='Fan out across these tenant shards ("*" = all) and merge results.'
+    )
+    mmr_lambda: float | None = Field(
+        None, ge=0.0, le=1.0, description="MMR relevance/diversity trade-off (1.0 = no diversity)."
+    )
+    adaptive: bool | None = Field(
+        None, description="Apply score threshold/gap cutoffs to top_k (default: RAG_ADAPTIVE_TOP_K)."
+    )
+
+    @model_validator(mode="after")
+    def _one_tenant_scope(self):
+        if self.tenant is not None and self.tenants:
+            raise ValueError("Send either tenant or tenants, not both.")
+        return self
 
 class Citation(BaseModel):
     source_id: str
     snippet: str
+    source_path: str | None = None
+    page_start: int | None = None
+    page_end: int | None = None
+    title_path: list[str] = []
+    score: float | None = None
 
 class AnswerQuality(BaseModel):
     groundedness: float
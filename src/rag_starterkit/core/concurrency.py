@@ -0,0 +1,127 @@
+import asyncio
+import collections
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from rag_starterkit.core.config import get_settings, on_reload
+
+_settings = get_settings()
+
+# CPU-bound retrieval (embedding wait + vector search) gets its own pool so it
+# never competes with Starlette's shared threadpool
+SEARCH_WORKERS = _settings.search_workers
+
+# Admission control for /v1/query: requests beyond
+# MAX_CONCURRENT_QUERIES + MAX_QUEUED_QUERIES are rejected with 429.
+# Both limits are hot-reloadable (see query_admission.resize).
+MAX_CONCURRENT_QUERIES = _settings.max_concurrent_queries
+MAX_QUEUED_QUERIES = _settings.max_queued_queries
+
+# The end-to-end deadline per query (queue wait + retrieval + generation +
+# judge) is read per request from settings.query_deadline_s
+
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="rag-search")
+
+
+async def run_in_executor(executor: Executor, fn, *args, **kwargs):
+    """
+    Await a blocking call on a dedicated executor. If the awaiting task is
+    cancelled before the call starts, the queued work is dropped.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+class Overloaded(Exception):
+    """Raised when the admission queue is full."""
+
+
+class AdmissionController:
+    """
+    Bounded concurrency with a bounded wait queue.
+
+    At most `max_concurrent` requests run at once; up to `max_queue` more wait
+    for a slot. Anything beyond that fails fast with Overloaded instead of
+    piling up behind slow LLM calls.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self._waiters: "collections.deque[asyncio.Future]" = collections.deque()
+        self._active = 0
+        self.rejected = 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def __aenter__(self):
+        if self._active + len(self._waiters) >= self.max_concurrent + self.max_queue:
+            self.rejected += 1
+            raise Overloaded()
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return self
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over just as we were cancelled; pass it on
+                self._active -= 1
+                self._wake()
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._active -= 1
+        self._wake()
+        return False
+
+    def _wake(self) -> None:
+        while self._waiters and self._active < self.max_concurrent:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self._active += 1
+                fut.set_result(None)
+
+    def resize(self, max_concurrent: int, max_queue: int) -> None:
+        """
+        Change limits under load. Growing admits queued requests right away;
+        shrinking takes effect as in-flight requests finish (nothing is
+        cancelled). Safe to call from any thread.
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        if self._waiters:
+            self._waiters[0].get_loop().call_soon_threadsafe(self._wake)
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+
+query_admission = AdmissionController(MAX_CONCURRENT_QUERIES, MAX_QUEUED_QUERIES)
+
+
+def _apply_settings(settings, changed) -> None:
+    if {"max_concurrent_queries", "max_queued_queries"} & set(changed):
+        query_admission.resize(settings.max_concurrent_queries, settings.max_queued_queries)
+
+
+on_reload(_apply_settings)
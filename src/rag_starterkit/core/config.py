@@ -0,0 +1,265 @@
+"""
+Typed configuration for every tunable knob.
+
+Values resolve in this order (highest first):
+  1. environment variables (RAG_<FIELD>, e.g. RAG_EMBED_MAX_BATCH; OLLAMA_URL is also accepted)
+  2. the env file (RAG_ENV_FILE, default ".env")
+  3. the profile selected by RAG_ENV (local | dev | prod)
+  4. field defaults
+
+Fields in RELOADABLE_FIELDS can change at runtime: edit the env file (or call
+reload_settings / POST /v1/debug/config/reload) and registered listeners
+apply the new values. Any other change is reported as needing a restart.
+"""
+import contextlib
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Literal, Optional
+
+from pydantic import AliasChoices, Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logger = logging.getLogger(__name__)
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="RAG_", extra="ignore", populate_by_name=True)
+
+    env: Literal["local", "dev", "prod"] = "local"
+
+    # LLM (Ollama)
+    ollama_url: str = Field(
+        "http://localhost:11434/api/generate",
+        validation_alias=AliasChoices("RAG_OLLAMA_URL", "OLLAMA_URL"),
+    )
+    llm_model: str = "qwen2.5:3b-instruct"
+    llm_timeout_s: float = 300.0
+    llm_connect_timeout_s: float = 5.0
+    judge_url: Optional[str] = None  # defaults to ollama_url
+    judge_model: Optional[str] = None  # defaults to llm_model
+    judge_mode: Literal["sequential", "skip_canned", "streaming"] = "skip_canned"
+    judge_max_retries: int = Field(1, ge=0)
+
+    # Embeddings
+    embed_model: str = "all-MiniLM-L6-v2"
+    embed_backend: Literal["torch", "onnx"] = "torch"
+    embed_onnx_file: str = ""
+    embed_threads: int = Field(0, ge=0)
+    embed_workers: int = Field(1, ge=1)
+    embed_max_batch: int = Field(64, ge=1)
+    embed_max_wait_ms: float = Field(5.0, ge=0)
+    query_cache_size: int = Field(2048, ge=0)
+
+    # Retrieval / vector store
+    default_top_k: int = Field(4, ge=1)
+    # Exact search over in-memory candidate vectors for filtered scopes up to
+    # this size (0 = off). Costs one float32 vector per chunk in RAM; shard
+    # indexes built while it was 0 hold no vectors and search Chroma by IDs.
+    prefilter_max_candidates: int = Field(2000, ge=0)
+    max_loaded_shards: int = Field(8, ge=1)
+    shard_memory_limit_bytes: int = Field(0, ge=0)
+    fanout_workers: int = Field(4, ge=1)
+    mmr_lambda: float = Field(0.7, ge=0.0, le=1.0)
+    mmr_fetch_factor: int = Field(3, ge=1)
+    # Adaptive top_k: drop hits below min_score (cosine) and cut at the first
+    # score drop larger than score_gap; no survivors -> refusal without LLM calls.
+    # Off by default until min_score/score_gap are calibrated for the embedding
+    # model with eval/adaptive_topk_report.
+    adaptive_top_k: bool = False
+    min_score: float = Field(0.25, ge=-1.0, le=1.0)
+    score_gap: float = Field(0.15, ge=0.0, le=2.0)
+
+    # Request path
+    search_workers: int = Field(4, ge=1)
+    max_concurrent_queries: int = Field(8, ge=1)
+    max_queued_queries: int = Field(32, ge=0)
+    query_deadline_s: float = Field(120.0, gt=0)
+
+    # Ingest
+    max_chars: int = Field(2200, ge=200)
+    min_chars: int = Field(200, ge=0)
+    chunk_tokens: int = Field(320, ge=16)  # sliding-window size (whitespace tokens)
+    chunk_overlap_tokens: int = Field(48, ge=0)
+    sim_threshold: float = Field(0.78, ge=0.0, le=1.0)
+
+    # Hot reload: poll the env file every N seconds (0 = off)
+    config_reload_interval_s: float = Field(0.0, ge=0)
+
+    @field_validator("judge_mode", mode="before")
+    @classmethod
+    def _legacy_judge_mode(cls, v):
+        # "concurrent" was the old name of "skip_canned"
+        return "skip_canned" if v == "concurrent" else v
+
+
+# Per-environment overrides; anything set via env/env file wins over these
+PROFILES: Dict[str, Dict] = {
+    "local": {},
+    "dev": {
+        "query_deadline_s": 60.0,
+    },
+    "prod": {
+        "embed_workers": 2,
+        "search_workers": 8,
+        "fanout_workers": 8,
+        "max_concurrent_queries": 16,
+        "max_queued_queries": 64,
+        "query_deadline_s": 30.0,
+        "query_cache_size": 8192,
+        "config_reload_interval_s": 10.0,
+    },
+}
+
+# Knobs that are safe to change under live load. Not embed_model/backend:
+# stored vectors were computed with the running model, so switching it needs
+# a restart and a re-ingest (snapshot import refuses a model mismatch).
+RELOADABLE_FIELDS = frozenset({
+    "judge_mode",
+    "judge_max_retries",
+    "embed_max_batch",
+    "embed_max_wait_ms",
+    "query_cache_size",
+    "default_top_k",
+    "prefilter_max_candidates",
+    "mmr_lambda",
+    "mmr_fetch_factor",
+    "adaptive_top_k",
+    "min_score",
+    "score_gap",
+    "max_concurrent_queries",
+    "max_queued_queries",
+    "query_deadline_s",
+    "llm_timeout_s",
+    "llm_connect_timeout_s",
+    "sim_threshold",
+    "chunk_tokens",
+    "chunk_overlap_tokens",
+    "config_reload_interval_s",
+})
+
+
+def env_file() -> str:
+    return os.getenv("RAG_ENV_FILE", ".env")
+
+
+def load_settings() -> Settings:
+    base = Settings(_env_file=env_file())
+    overrides = {
+        k: v for k, v in PROFILES.get(base.env, {}).items() if k not in base.model_fields_set
+    }
+    return Settings.model_validate({**base.model_dump(), **overrides}) if overrides else base
+
+
+_settings: Optional[Settings] = None
+_lock = threading.Lock()
+_listeners: List[Callable[[Settings, Dict], None]] = []
+
+
+def get_settings() -> Settings:
+    global _settings
+    if _settings is None:
+        with _lock:
+            if _settings is None:
+                _settings = load_settings()
+    return _settings
+
+
+def on_reload(callback: Callable[[Settings, Dict], None]) -> None:
+    """
+    Register callback(settings, changed) run after reloadable knobs change.
+    """
+    _listeners.append(callback)
+
+
+def update_settings(**changes) -> Dict:
+    """
+    Apply changes to reloadable knobs at runtime. Returns the applied diff;
+    unknown or non-reloadable fields raise ValueError.
+    """
+    global _settings
+    bad = set(changes) - RELOADABLE_FIELDS
+    if bad:
+        raise ValueError(f"Not reloadable at runtime: {sorted(bad)}")
+    with _lock:
+        current = get_settings() if _settings is None else _settings
+        new = Settings.model_validate({**current.model_dump(), **changes})
+        changed = {k: getattr(new, k) for k in changes if getattr(new, k) != getattr(current, k)}
+        _settings = new
+    if changed:
+        for cb in list(_listeners):
+            try:
+                cb(new, changed)
+            except Exception:
+                logger.exception("Config reload listener failed")
+    return changed
+
+
+def reload_settings() -> Dict:
+    """
+    Re-read env + env file. Reloadable changes are applied; the rest are
+    returned under "restart_required" and left untouched.
+    """
+    fresh = load_settings()
+    current = get_settings()
+    diff = {
+        k: getattr(fresh, k)
+        for k in Settings.model_fields
+        if getattr(fresh, k) != getattr(current, k)
+    }
+    safe = {k: v for k, v in diff.items() if k in RELOADABLE_FIELDS}
+    applied = update_settings(**safe) if safe else {}
+    restart = sorted(set(diff) - RELOADABLE_FIELDS)
+    if restart:
+        logger.warning("Config changes need a restart: %s", restart)
+    if applied:
+        logger.info("Config reloaded: %s", applied)
+    return {"applied": applied, "restart_required": restart}
+
+
+@contextlib.contextmanager
+def override_settings(**changes):
+    """
+    Temporarily replace any settings (tests/benchmarks). Listeners are not
+    run, so only knobs read per call take effect.
+    """
+    global _settings
+    previous = get_settings()
+    _settings = Settings.model_validate({**previous.model_dump(), **changes})
+    try:
+        yield _settings
+    finally:
+        _settings = previous
+
+
+_watcher: Optional[threading.Thread] = None
+
+
+def start_config_watcher() -> None:
+    """
+    Poll the env file's mtime and reload on change, every
+    config_reload_interval_s seconds (no-op when 0).
+    """
+    global _watcher
+    if _watcher is not None or get_settings().config_reload_interval_s <= 0:
+        return
+
+    def _mtime():
+        path = env_file()
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    def _loop():
+        last = _mtime()
+        while True:
+            time.sleep(get_settings().config_reload_interval_s or 10.0)
+            try:
+                mtime = _mtime()
+                if mtime != last:
+                    last = mtime
+                    reload_settings()
+            except Exception:
+                logger.exception("Config reload failed")
+
+    _watcher = threading.Thread(target=_loop, name="rag-config-watcher", daemon=True)
+    _watcher.start()
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+
+
+class Counters:
+    """
+    Minimal thread-safe in-process counters (exposed via /v1/debug/metrics).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, int] = {}
+
+    def inc(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + n
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._values.get(name, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._values)
+
+
+class ReaskTracker:
+    """
+    Counts queries re-asked shortly after their answer was rejected; these
+    are load the service caused itself. Re-asks after a rejection that came
+    from a judge failure (not a real hallucination verdict) are counted
+    separately as wasted.
+    """
+
+    def __init__(self, counters: Counters, window_s: float = 600.0, max_entries: int = 10000):
+        self._counters = counters
+        self._window = window_s
+        self._max = max_entries
+        self._lock = threading.Lock()
+        self._rejected: "OrderedDict[str, tuple[float, bool]]" = OrderedDict()
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join((query or "").lower().split())
+
+    def observe(self, query: str) -> None:
+        key = self._key(query)
+        now = time.time()
+        with self._lock:
+            hit = self._rejected.pop(key, None)
+        if hit is None or now - hit[0] > self._window:
+            return
+        self._counters.inc("reasks_after_rejection")
+        if hit[1]:
+            self._counters.inc("wasted_reasks_judge_failure")
+
+    def record_rejection(self, query: str, judge_failed: bool) -> None:
+        with self._lock:
+            self._rejected[self._key(query)] = (time.time(), judge_failed)
+            self._rejected.move_to_end(self._key(query))
+            while len(self._rejected) > self._max:
+                self._rejected.popitem(last=False)
+
+
+counters = Counters()
+reasks = ReaskTracker(counters)
@@ -1,9 +1,50 @@
 from pathlib import Path
 from rag_starterkit.data.pdf_loader import load_pdf_text
-from rag_starterkit.rag.chunking import chunk_faq_text
+from rag_starterkit.ingest.ingest_pipeline import hierarchical_docs_from_pdf
+from rag_starterkit.core.config import get_settings
+from rag_starterkit.rag.chunking import chunk_faq_text, sliding_window_chunks
 from rag_starterkit.rag.vectorstore import add_documents
 
-def ingest_path(path: str):
+
+def _pdf_docs(fp: Path, mode: str, bank: str | None) -> list[dict]:
+    # Hierarchical → leaf chunks with section metadata
+    if mode == "hierarchical":
+        return hierarchical_docs_from_pdf(str(fp), bank=bank)
+
+    # FAQ-aware chunking; PDFs without numbered questions fall back to
+    # sentence-aligned sliding windows, and so do FAQ chunks longer than a
+    # window (e.g. a PDF without line breaks scans as one huge "question"),
+    # which the embedding model would otherwise truncate. Ids are prefixed
+    # with the file stem: "faq_N" alone repeats across PDFs.
+    settings = get_settings()
+
+    def windows(prefix: str, text: str) -> list[dict]:
+        return [
+            {"id": f"{prefix}_w{i}", "text": t}
+            for i, t in enumerate(
+                sliding_window_chunks(text, settings.chunk_tokens, settings.chunk_overlap_tokens), start=1
+            )
+        ]
+
+    raw_text = load_pdf_text(str(fp))
+    docs = []
+    for d in chunk_faq_text(raw_text):
+        doc_id = f"{fp.stem}_{d['id']}"
+        if len(d["text"].split()) > settings.chunk_tokens:
+            docs.extend(windows(doc_id, d["text"]))
+        else:
+            docs.append({**d, "id": doc_id})
+    if not docs:
+        docs = windows(fp.stem, raw_text)
+    for d in docs:
+        d["metadata"] = {"doc_id": fp.stem, "source_path": str(fp), "bank": bank}
+    return docs
+
+
+def collect_documents(path: str, mode: str = "faq", bank: str | None = None) -> list[dict]:
+    """
+    Load and chunk a folder or single PDF into vectorstore docs (no storing).
+    """
     p = Path(path)
 
     docs = []
@@ -15,11 +56,8 @@ def ingest_path(path: str):
     if p.is_dir():
         for fp in p.iterdir():
 
-            # PDF → FAQ-aware chunking
             if fp.suffix.lower() == ".pdf":
-                raw_text = load_pdf_text(str(fp))
-                faq_chunks = chunk_faq_text(raw_text)
-                docs.extend(faq_chunks)
+                docs.extend(_pdf_docs(fp, mode, bank))
 
             # TXT → simple text
             elif fp.suffix.lower() == ".txt":
@@ -27,18 +65,21 @@ def ingest_path(path: str):
                 if text:
                     docs.append({
                         "id": fp.name,
-                        "text": text
+                        "text": text,
+                        "metadata": {"doc_id": fp.stem, "source_path": str(fp), "bank": bank},
                     })
 
     # Case 2: Single PDF
     elif p.is_file() and p.suffix.lower() == ".pdf":
-        raw_text = load_pdf_text(str(p))
-        docs = chunk_faq_text(raw_text)
+        docs = _pdf_docs(p, mode, bank)
 
     else:
         raise ValueError("Unsupported file type")
 
-    if docs:
-        stored = add_documents(docs)
+    return docs
+
+
+def ingest_path(path: str, mode: str = "faq", bank: str | None = None, tenant: str | None = None):
+    docs = collect_documents(path, mode=mode, bank=bank)
+    stored = add_documents(docs, tenant=tenant) if docs else 0
     return {"chunks": len(docs), "stored": stored}
-    
@@ -1,10 +1,9 @@
-import fitz  # PyMuPDF
+from rag_starterkit.data.pdf_text_cache import open_pdf
 
 def load_pdf_text(pdf_path: str) -> str:
-    doc = fitz.open(pdf_path)
     pages = []
-    for page in doc:
-        text = page.get_text("text")
-        if text:
-            pages.append(text.strip())
+    with open_pdf(pdf_path) as doc:
+        for _, text in doc.iter_pages():
+            if text:
+                pages.append(text.strip())
     return "\n".join(pages)
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+# Use an absolute path to avoid "working directory" surprises
+BASE_DIR = os.path.abspath(os.getcwd())
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS docs (
+        file_hash  TEXT PRIMARY KEY,
+        page_count INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pages (
+        file_hash TEXT NOT NULL,
+        page_num  INTEGER NOT NULL,
+        text      BLOB NOT NULL,
+        PRIMARY KEY (file_hash, page_num)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class PdfTextCache:
+    """
+    Per-page extracted text, zlib-compressed in SQLite and keyed by
+    (file content hash, page number). Identical files share entries no matter
+    where they live, and re-ingests never re-run PyMuPDF.
+    """
+
+    def __init__(self, root: str = CACHE_DIR):
+        os.makedirs(root, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "pdf_text.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        for stmt in _SCHEMA:
+            self._db.execute(stmt)
+        self._lock = threading.Lock()
+        # (path, size, mtime) -> hash, so unchanged files are not re-hashed
+        self._hashes: Dict[Tuple[str, int, float], str] = {}
+
+    def hash_for(self, path: str) -> str:
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_size, st.st_mtime)
+        h = self._hashes.get(key)
+        if h is None:
+            h = file_hash(path)
+            self._hashes[key] = h
+        return h
+
+    def page_count(self, fhash: str) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT page_count FROM docs WHERE file_hash = ?", (fhash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_page_count(self, fhash: str, n: int) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO docs VALUES (?, ?)", (fhash, n))
+            self._db.commit()
+
+    def get_pages(self, fhash: str, start: int, end: int) -> Dict[int, str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT page_num, text FROM pages WHERE file_hash = ? AND page_num BETWEEN ? AND ?",
+                (fhash, start, end),
+            ).fetchall()
+        return {n: zlib.decompress(t).decode("utf-8") for n, t in rows}
+
+    def put_pages(self, fhash: str, pages: Dict[int, str]) -> None:
+        if not pages:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?)",
+                [(fhash, n, zlib.compress(t.encode("utf-8"), 6)) for n, t in pages.items()],
+            )
+            self._db.commit()
+
+
+class PdfDocument:
+    """
+    Lazy page access on top of PdfTextCache: pages are served from the cache
+    and only missing ones are extracted (the PDF is opened on first miss).
+    """
+
+    def __init__(self, path: str, cache: "PdfTextCache"):
+        self.path = path
+        self._cache = cache
+        self.file_hash = cache.hash_for(path)
+        self._doc = None
+        self._count = cache.page_count(self.file_hash)
+
+    def _open(self):
+        if self._doc is None:
+            self._doc = fitz.open(self.path)
+            if self._count is None:
+                self._count = len(self._doc)
+                self._cache.set_page_count(self.file_hash, self._count)
+        return self._doc
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._open()
+        return self._count
+
+    def iter_pages(self, start: int = 1, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_num, text) for 1-based pages start..end (inclusive).
+        """
+        end = min(end or len(self), len(self))
+        if start > end:
+            return
+        cached = self._cache.get_pages(self.file_hash, start, end)
+        missing = {}
+        for n in range(start, end + 1):
+            if n not in cached:
+                missing[n] = self._open()[n - 1].get_text("text") or ""
+                cached[n] = missing[n]
+        self._cache.put_pages(self.file_hash, missing)
+        for n in range(start, end + 1):
+            yield n, cached[n]
+
+    def close(self) -> None:
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+_cache: Optional[PdfTextCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_text_cache() -> PdfTextCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PdfTextCache()
+    return _cache
+
+
+def open_pdf(path: str) -> PdfDocument:
+    return PdfDocument(path, get_pdf_text_cache())
@@ -0,0 +1,125 @@
+"""
+Adaptive top_k / early-exit report on a local corpus.
+
+    python -m rag_starterkit.eval.adaptive_topk_report --path samples/documents \
+        --queries samples/queries.json --negatives samples/negative_queries.json
+
+Compares fixed top_k retrieval with the min_score / score_gap cutoffs:
+hit rate (expected answer present in the kept contexts), contexts and prompt
+characters per query, refusals on off-domain queries, and LLM calls saved
+(generation + judge per answered query; early exits make none). Runs fully
+in memory; nothing is written to the store. Use it to calibrate
+RAG_MIN_SCORE and RAG_SCORE_GAP for the embedding model in use.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from rag_starterkit.core.config import get_settings
+from rag_starterkit.data.ingest import collect_documents
+from rag_starterkit.rag.embeddings import embed_texts
+from rag_starterkit.rag.retriever import adaptive_cutoff
+
+LLM_CALLS_PER_ANSWER = 2  # generation + judge
+
+
+def _load_queries(path: str) -> list[dict]:
+    out = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line:
+            out.append(json.loads(line))
+    return out
+
+
+def _embed(texts: list[str]) -> np.ndarray:
+    v = np.asarray(embed_texts(texts), dtype=np.float32)
+    return v / (np.linalg.norm(v, axis=1, keepdims=True) + 1e-12)
+
+
+def _retrieve(q: np.ndarray, docs: list[dict], vecs: np.ndarray, k: int) -> list[dict]:
+    sims = vecs @ q
+    return [
+        {"text": docs[i]["text"], "score": float(sims[i])}
+        for i in np.argsort(-sims)[:k]
+    ]
+
+
+def _summarize(runs: list[list[dict]], expected: list[str]) -> dict:
+    answered = [r for r in runs if r]
+    hits = sum(1 for r, e in zip(runs, expected) if any(e.lower() in c["text"].lower() for c in r))
+    return {
+        "hit_rate": hits / len(runs) if runs else 0.0,
+        "avg_contexts": sum(len(r) for r in runs) / len(runs) if runs else 0.0,
+        "avg_prompt_chars": sum(len(c["text"]) for r in runs for c in r) / len(runs) if runs else 0.0,
+        "early_exits": len(runs) - len(answered),
+        "llm_calls": LLM_CALLS_PER_ANSWER * len(answered),
+    }
+
+
+def run(
+    path: str,
+    queries_path: str,
+    negatives_path: str | None = None,
+    top_k: int = 4,
+    min_score: float | None = None,
+    score_gap: float | None = None,
+    mode: str = "faq",
+) -> dict:
+    settings = get_settings()
+    min_score = settings.min_score if min_score is None else min_score
+    score_gap = settings.score_gap if score_gap is None else score_gap
+
+    docs = collect_documents(path, mode=mode)
+    vecs = _embed([d["text"] for d in docs])
+
+    queries = _load_queries(queries_path)
+    negatives = _load_queries(negatives_path) if negatives_path else []
+    q_vecs = _embed([q["query"] for q in queries + negatives])
+
+    fixed = [_retrieve(q, docs, vecs, top_k) for q in q_vecs]
+    adaptive = [adaptive_cutoff(r, min_score, score_gap) for r in fixed]
+    n = len(queries)
+    expected = [q.get("expected", "") for q in queries]
+
+    baseline = _summarize(fixed[:n], expected)
+    cut = _summarize(adaptive[:n], expected)
+    neg_fixed, neg_cut = _summarize(fixed[n:], [""] * len(negatives)), _summarize(adaptive[n:], [""] * len(negatives))
+    calls_before = baseline["llm_calls"] + neg_fixed["llm_calls"]
+    calls_after = cut["llm_calls"] + neg_cut["llm_calls"]
+
+    return {
+        "corpus": path,
+        "chunks": len(docs),
+        "queries": n,
+        "negatives": len(negatives),
+        "top_k": top_k,
+        "min_score": min_score,
+        "score_gap": score_gap,
+        "fixed_top_k": baseline,
+        "adaptive": cut,
+        "negative_refusal_rate": neg_cut["early_exits"] / len(negatives) if negatives else None,
+        "llm_calls_fixed": calls_before,
+        "llm_calls_adaptive": calls_after,
+        "llm_calls_saved": calls_before - calls_after,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--path", default="samples/documents")
+    ap.add_argument("--queries", default="samples/queries.json")
+    ap.add_argument("--negatives", default="samples/negative_queries.json")
+    ap.add_argument("--top-k", type=int, default=4)
+    ap.add_argument("--min-score", type=float, default=None)
+    ap.add_argument("--score-gap", type=float, default=None)
+    ap.add_argument("--mode", choices=["faq", "hierarchical"], default="faq")
+    args = ap.parse_args()
+    report = run(args.path, args.queries, args.negatives, args.top_k, args.min_score, args.score_gap, args.mode)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
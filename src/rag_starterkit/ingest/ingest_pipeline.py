@@ -0,0 +1,69 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from rag_starterkit.core.config import get_settings
+
+from .pdf_loader import load_pdf_pages
+from .toc_parser import TocItem, parse_toc_from_text
+from .heading_detector import detect_headings
+from .hierarchy_builder import build_tree
+from .leaf_chunker import leaf_chunks_from_tree
+from .concept_tagger import tag_concepts
+
+# TOC is expected within the first few pages; fewer items than this means
+# the TOC is missing/unreliable and we fall back to heading detection
+TOC_PAGES = 4
+MIN_TOC_ITEMS = 3
+
+
+def hierarchical_docs_from_pdf(
+    pdf_path: str,
+    doc_id: Optional[str] = None,
+    bank: Optional[str] = None,
+    version: Optional[str] = None,
+) -> List[Dict]:
+    """
+    PDF -> TOC/headings -> hierarchy -> leaf chunks -> vectorstore docs.
+
+    Each doc carries the leaf_chunker metadata plus concept_tags and the
+    optional bank/version, so queries can be scoped with metadata filters.
+    """
+    doc_id = doc_id or Path(pdf_path).stem
+
+    # Only the first pages are needed to find a TOC
+    toc_pages = load_pdf_pages(pdf_path, max_pages=TOC_PAGES)
+    if not toc_pages:
+        return []
+    toc = parse_toc_from_text("\n".join(p.text for p in toc_pages))
+
+    pages = load_pdf_pages(pdf_path)
+    if len(toc) < MIN_TOC_ITEMS:
+        toc = detect_headings(pages)
+    if not toc:
+        # No structure found: treat the whole document as a single leaf
+        toc = [TocItem(level=1, title=doc_id, start_page=pages[0].page_num)]
+
+    root = build_tree(toc)
+    settings = get_settings()
+    chunks = leaf_chunks_from_tree(
+        pages=pages,
+        doc_id=doc_id,
+        source_path=str(pdf_path),
+        root=root,
+        doc_last_page=pages[-1].page_num,
+        max_chars=settings.max_chars,
+        min_chars=settings.min_chars,
+        chunk_tokens=settings.chunk_tokens,
+        overlap_tokens=settings.chunk_overlap_tokens,
+    )
+
+    docs = []
+    for c in chunks:
+        meta = dict(c.metadata)
+        meta["concept_tags"] = tag_concepts(c.text)
+        if bank:
+            meta["bank"] = bank
+        if version:
+            meta["version"] = version
+        docs.append({"id": c.chunk_id, "text": c.text, "metadata": meta})
+    return docs
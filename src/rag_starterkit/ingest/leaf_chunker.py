@@ -15,6 +15,8 @@ import re
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
+from rag_starterkit.rag.chunking import DEFAULT_CHUNK_TOKENS, DEFAULT_OVERLAP_TOKENS, sliding_window_chunks
+
 from .pdf_loader import Page
 from .hierarchy_builder import Node
 
@@ -119,6 +121,8 @@ def leaf_chunks_from_tree(
     doc_last_page: int,
     max_chars: int = 2200,
     min_chars: int = 200,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
 ) -> List[Chunk]:
     """
     Builds leaf-only chunks from a hierarchy tree.
@@ -126,7 +130,8 @@ def leaf_chunks_from_tree(
     Rules:
     - If node has children: do NOT chunk parent; chunk children.
     - If leaf node: chunk (title + content).
-    - If leaf content > max_chars: split into sequential parts (except tables/annexures).
+    - If leaf content > max_chars: split into sentence-aligned windows of
+      chunk_tokens with overlap_tokens overlap (except tables/annexures).
     - Always preserve natural order using order_key.
     """
 
@@ -190,13 +195,13 @@ def leaf_chunks_from_tree(
         elif is_table or is_annexure or len(base) <= max_chars:
             chunk_texts = [base]
 
-        # Fallback: split only for unnumbered, very long text
+        # Fallback: split only for unnumbered, very long text; later windows
+        # repeat the leaf title so each chunk carries its section context
         else:
-            chunk_texts = []
-            cursor = 0
-            while cursor < len(base):
-                chunk_texts.append(base[cursor : cursor + max_chars])
-                cursor += max_chars
+            chunk_texts = [
+                ct if i == 0 else f"{leaf_title}\n{ct}"
+                for i, ct in enumerate(sliding_window_chunks(base, chunk_tokens, overlap_tokens))
+            ]
 
         # Final stacks: ensure leaf title appears once
         final_title_path = _push_unique(title_stack, leaf_title)
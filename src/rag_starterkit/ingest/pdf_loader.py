@@ -1,17 +1,16 @@
 from dataclasses import dataclass
-from typing import List
-import fitz  # PyMuPDF
+from typing import List, Optional
+from rag_starterkit.data.pdf_text_cache import open_pdf
 
 @dataclass
 class Page:
     page_num: int
     text: str
 
-def load_pdf_pages(pdf_path: str) -> List[Page]:
-    doc = fitz.open(pdf_path)
-    pages: List[Page] = []
-    for i in range(len(doc)):
-        t = doc[i].get_text("text") or ""
-        pages.append(Page(page_num=i + 1, text=t))
-    doc.close()
-    return pages
+def load_pdf_pages(pdf_path: str, max_pages: Optional[int] = None) -> List[Page]:
+    """
+    Pages 1..max_pages (all by default), served from the shared extracted-text
+    cache; only uncached pages are extracted with PyMuPDF.
+    """
+    with open_pdf(pdf_path) as doc:
+        return [Page(page_num=n, text=t) for n, t in doc.iter_pages(1, max_pages)]
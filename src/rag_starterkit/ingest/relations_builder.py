@@ -1,5 +1,6 @@
 import json
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from rag_starterkit.core.config import get_settings
 from rag_starterkit.rag.embeddings import embed_texts
 import numpy as np
 
@@ -8,11 +9,14 @@ def _cos(a: np.ndarray, b: np.ndarray) -> float:
     b = b / (np.linalg.norm(b) + 1e-12)
     return float(a @ b)
 
-def build_relations(chunks: List[Dict], out_path: str, build_similarity: bool = True, sim_threshold: float = 0.78):
+def build_relations(chunks: List[Dict], out_path: str, build_similarity: bool = True, sim_threshold: Optional[float] = None):
     """
     chunks: list of dicts with keys:
       - chunk_id, doc_id, bank (optional), text, concept_tags (list[str])
+    sim_threshold defaults to settings.sim_threshold.
     """
+    if sim_threshold is None:
+        sim_threshold = get_settings().sim_threshold
     rel = {"concept_edges": [], "similarity_edges": []}
 
     # Concept edges
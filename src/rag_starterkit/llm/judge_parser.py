@@ -0,0 +1,126 @@
+import json
+from typing import Dict, List, Optional
+
+RISK_LEVELS = ("low", "medium", "high")
+
+# JSON schema passed to Ollama's `format` so decoding is constrained to it
+JUDGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "groundedness": {"type": "number", "minimum": 0, "maximum": 1},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        "hallucination_risk": {"type": "string", "enum": list(RISK_LEVELS)},
+        "unsupported_points": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["groundedness", "confidence", "hallucination_risk", "unsupported_points"],
+}
+
+
+class JsonObjectExtractor:
+    """
+    Incremental scanner that returns the first complete, valid top-level JSON
+    object in a character stream, skipping any prose or code fences around it.
+    Feed chunks as they arrive; `feed` returns the object once it closes.
+    """
+
+    def __init__(self):
+        self._buf: List[str] = []
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self.result: Optional[Dict] = None
+
+    def feed(self, chunk: str) -> Optional[Dict]:
+        if self.result is not None:
+            return self.result
+        for ch in chunk:
+            if self._depth == 0:
+                if ch == "{":
+                    self._buf = ["{"]
+                    self._depth = 1
+                continue
+
+            self._buf.append(ch)
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+                continue
+
+            if ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        obj = json.loads("".join(self._buf))
+                    except ValueError:
+                        obj = None
+                    if isinstance(obj, dict):
+                        self.result = obj
+                        return obj
+                    # Not valid JSON: keep scanning for the next object
+                    self._buf = []
+        return None
+
+
+def extract_json_object(text: str) -> Optional[Dict]:
+    return JsonObjectExtractor().feed(text or "")
+
+
+def _unit(value) -> Optional[float]:
+    """
+    Read a 0-1 score. The prompt asks for 0-1, so other scales are only
+    accepted when they are explicit or unambiguous: "85%", "8/10", or a bare
+    number in (1, 10] (a 1-10 scale). Anything else is unusable.
+    """
+    text = str(value).strip()
+    try:
+        if text.endswith("%"):
+            v = float(text[:-1]) / 100.0
+        elif "/" in text:
+            num, den = text.split("/", 1)
+            v = float(num) / float(den)
+        else:
+            v = float(text)
+            if 1.0 < v <= 10.0:
+                v = v / 10.0
+            elif v > 10.0:
+                return None
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return min(1.0, max(0.0, v))
+
+
+def coerce_quality(obj: Dict) -> Optional[Dict]:
+    """
+    Clamp a judge object into the AnswerQuality schema. Returns None when the
+    core scores are missing or unusable (a real parse failure).
+    """
+    groundedness = _unit(obj.get("groundedness"))
+    confidence = _unit(obj.get("confidence"))
+    if groundedness is None:
+        return None
+    if confidence is None:
+        confidence = groundedness
+
+    risk = str(obj.get("hallucination_risk", "")).strip().lower()
+    if risk not in RISK_LEVELS:
+        risk = "low" if groundedness >= 0.75 else "medium" if groundedness >= 0.4 else "high"
+
+    points = obj.get("unsupported_points") or []
+    if isinstance(points, str):
+        points = [points]
+    points = [str(p)[:200] for p in points if str(p).strip()][:20]
+
+    return {
+        "groundedness": groundedness,
+        "confidence": confidence,
+        "hallucination_risk": risk,
+        "unsupported_points": points,
+    }
@@ -1,11 +1,47 @@
-import requests
+import asyncio
+import json
+from typing import AsyncIterator
+import httpx
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL = "qwen2.5:3b-instruct"
+from rag_starterkit.core.config import get_settings
 
-def generate_llm_answer(prompt: str) -> str:
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Shared pooled client for Ollama calls (re-created if the event loop changes,
+    e.g. under TestClient). Timeouts are passed per request (llm_timeout()),
+    so hot-reloaded values apply without rebuilding the pool.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(timeout=llm_timeout())
+        _client_loop = loop
+    return _client
+
+
+def llm_timeout() -> httpx.Timeout:
+    settings = get_settings()
+    return httpx.Timeout(settings.llm_timeout_s, connect=settings.llm_connect_timeout_s)
+
+
+def num_ctx_for(prompt: str, num_predict: int, floor: int = 2048, ceil: int = 8192) -> int:
+    """
+    Size the context window to the prompt (~4 chars/token) plus the output
+    budget, rounded up to a multiple of 1024. Oversized windows cost KV-cache
+    memory and prefill time; undersized ones silently truncate sources.
+    """
+    need = len(prompt) // 4 + num_predict + 64
+    return max(floor, min(ceil, -(-need // 1024) * 1024))
+
+
+async def generate_llm_answer(prompt: str) -> str:
+    settings = get_settings()
     payload = {
-        "model": MODEL,
+        "model": settings.llm_model,
         "prompt": prompt,
         "stream": False,
         "options": {
@@ -14,6 +50,34 @@ def generate_llm_answer(prompt: str) -> str:
         }
     }
 
-    resp = requests.post(OLLAMA_URL, json=payload, timeout=300)
+    resp = await get_async_client().post(settings.ollama_url, json=payload, timeout=llm_timeout())
     resp.raise_for_status()
     return resp.json()["response"]
+
+
+async def stream_llm_answer(prompt: str) -> AsyncIterator[str]:
+    """
+    Same request as generate_llm_answer but streamed: yields response
+    fragments as Ollama produces them.
+    """
+    settings = get_settings()
+    payload = {
+        "model": settings.llm_model,
+        "prompt": prompt,
+        "stream": True,
+        "options": {
+            "temperature": 0.1,
+            "top_p": 0.9
+        }
+    }
+
+    async with get_async_client().stream("POST", settings.ollama_url, json=payload, timeout=llm_timeout()) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            msg = json.loads(line)
+            if msg.get("response"):
+                yield msg["response"]
+            if msg.get("done"):
+                break
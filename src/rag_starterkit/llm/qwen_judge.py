@@ -1,11 +1,44 @@
-import requests
-import os
-import json
+import logging
 
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
-MODEL = os.getenv("RAG_LLM_MODEL", "qwen2.5:3b-instruct")
+import httpx
 
-def judge_answer(answer: str, contexts: list[dict]) -> dict:
+from rag_starterkit.core.config import get_settings
+from rag_starterkit.core.metrics import counters
+from rag_starterkit.llm.judge_parser import JUDGE_SCHEMA, coerce_quality, extract_json_object
+from rag_starterkit.llm.ollama_client import get_async_client, llm_timeout, num_ctx_for
+
+logger = logging.getLogger(__name__)
+
+JUDGE_NUM_PREDICT = 200
+
+# Settings used here:
+#   judge_url / judge_model: optional separate (smaller) judge endpoint/model,
+#     so judging does not queue behind other requests' generations on the
+#     main model; default to ollama_url / llm_model
+#   judge_max_retries: spent only on real failures (transport/5xx errors or
+#     output with no usable JSON object), never on an answer that parsed
+
+
+def judge_target() -> tuple[str, str]:
+    settings = get_settings()
+    return settings.judge_url or settings.ollama_url, settings.judge_model or settings.llm_model
+
+JUDGE_FAILURE_POINT = "Model failed to produce valid evaluation"
+
+
+async def _judge_once(payload: dict) -> dict | None:
+    resp = await get_async_client().post(judge_target()[0], json=payload, timeout=llm_timeout())
+    resp.raise_for_status()
+    raw = resp.json().get("response", "")
+    obj = extract_json_object(raw)
+    quality = coerce_quality(obj) if obj is not None else None
+    if quality is None:
+        counters.inc("judge_parse_failures")
+        logger.warning("Judge output not parseable: %.200r", raw)
+    return quality
+
+
+async def judge_answer(answer: str, contexts: list[dict]) -> dict:
     """
     Uses Qwen2.5 as an LLM-as-a-Judge to evaluate groundedness and hallucination risk.
     """
@@ -39,28 +72,39 @@ Return ONLY valid JSON in this exact schema:
 }}
 """
 
+    prompt = prompt.strip()
     payload = {
-        "model": MODEL,
-        "prompt": prompt.strip(),
+        "model": judge_target()[1],
+        "prompt": prompt,
         "stream": False,
+        "format": JUDGE_SCHEMA,
         "options": {
             "temperature": 0.0,
-            "num_predict": 200
+            "num_predict": JUDGE_NUM_PREDICT,
+            "num_ctx": num_ctx_for(prompt, JUDGE_NUM_PREDICT),
         }
     }
 
-    resp = requests.post(OLLAMA_URL, json=payload, timeout=300)
-    resp.raise_for_status()
+    counters.inc("judge_requests")
+    for attempt in range(get_settings().judge_max_retries + 1):
+        if attempt:
+            counters.inc("judge_retries")
+        try:
+            quality = await _judge_once(payload)
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            counters.inc("judge_transport_failures")
+            logger.warning("Judge call failed: %s", e)
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+                break  # client errors (e.g. unknown model) will not heal on retry
+            continue
+        if quality is not None:
+            return quality
 
-    raw = resp.json().get("response", "").strip()
-
-    try:
-        return json.loads(raw)
-    except Exception:
-        # Hard fallback if model breaks JSON
-        return {
-            "groundedness": 0.0,
-            "confidence": 0.0,
-            "hallucination_risk": "high",
-            "unsupported_points": ["Model failed to produce valid evaluation"]
-        }
+    # Hard fallback if the judge never produced a usable evaluation
+    counters.inc("judge_fallbacks")
+    return {
+        "groundedness": 0.0,
+        "confidence": 0.0,
+        "hallucination_risk": "high",
+        "unsupported_points": [JUDGE_FAILURE_POINT]
+    }
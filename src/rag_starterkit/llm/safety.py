@@ -3,3 +3,10 @@ SAFE_REFUSAL_MESSAGE = (
     "do not sufficiently support the generated response. "
     "Please review the cited sources or refine your question."
 )
+
+NO_CONTEXT_MESSAGE = "I do not have sufficient information from the provided documents."
+
+LLM_UNAVAILABLE_MESSAGE = (
+    "The language model did not respond in time. "
+    "Please try again or reduce the query scope."
+)
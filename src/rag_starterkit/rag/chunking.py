@@ -1,27 +1,130 @@
 import re
-from typing import List, Dict
+from collections import deque
+from typing import Dict, Iterator, List, Tuple
+
+# Line-anchored question marker ("12. How do I ..."); matched per line, so
+# there is no cross-line backtracking however large the document is
+_FAQ_LINE = re.compile(r"\s*(\d+)\.\s+(.*)")
+# "N." alone on a line (PyMuPDF often splits the number from the question);
+# the question is the next non-empty line. "2.5 lakh" matches neither.
+_FAQ_NUMBER = re.compile(r"\s*(\d+)\.\s*$")
+
+# Sentence end: terminal punctuation (+ closing quotes/brackets) then
+# whitespace, or a blank line. No nested quantifiers, so scanning is linear.
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s+|\n[ \t]*\n\s*")
+_TOKEN = re.compile(r"\S+")
+_ABBREVIATIONS = frozenset({
+    "rs", "no", "nos", "sr", "s.no", "viz", "i.e", "e.g", "etc", "mr", "mrs", "ms", "dr",
+    "st", "vs", "fig", "ref", "dt", "approx", "govt", "ltd", "co", "inc",
+})
+
+DEFAULT_CHUNK_TOKENS = 320
+DEFAULT_OVERLAP_TOKENS = 48
 
-FAQ_PATTERN = re.compile(
-    r"\n?\s*(\d+)\.\s+(.*?)\n(.*?)(?=\n\s*\d+\.|\Z)",
-    re.DOTALL
-)
 
 def chunk_faq_text(text: str) -> List[Dict]:
     """
     Splits FAQ-style documents into question-answer chunks.
+
+    Single pass over lines: a line starting with "N. <text>" opens question N
+    (or "N." alone, with the question on the next non-empty line); following
+    lines form its answer until the next numbered line.
     """
     chunks = []
+    q_no = question = pending = None
+    answer: List[str] = []
 
-    for match in FAQ_PATTERN.finditer(text):
-        q_no = match.group(1).strip()
-        question = match.group(2).strip()
-        answer = match.group(3).strip()
+    def flush():
+        if q_no is not None:
+            chunks.append({
+                "id": f"faq_{q_no}",
+                "text": f"Q{q_no}: {question}\nA: {chr(10).join(answer).strip()}",
+            })
 
-        chunk_text = f"Q{q_no}: {question}\nA: {answer}"
+    for line in text.splitlines():
+        m = _FAQ_LINE.match(line)
+        if m and m.group(2).strip():
+            flush()
+            q_no, question, answer, pending = m.group(1), m.group(2).strip(), [], None
+            continue
+        m = _FAQ_NUMBER.match(line)
+        if m:
+            flush()
+            q_no, pending = None, m.group(1)
+        elif pending is not None:
+            if line.strip():
+                q_no, question, answer, pending = pending, line.strip(), [], None
+        elif q_no is not None:
+            answer.append(line)
+    flush()
+    return chunks
 
-        chunks.append({
-            "id": f"faq_{q_no}",
-            "text": chunk_text
-        })
 
-    return chunks
+def iter_sentences(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) character spans of sentences in `text`. Periods after
+    common abbreviations ("Rs.", "No.", "e.g."), initials and list markers
+    ("12.") do not end a sentence. Look-behind is bounded, keeping it linear.
+    """
+    start = 0
+    for m in _SENTENCE_END.finditer(text):
+        if text[m.start()] == "." and m.group().count("\n") < 2:
+            head = text[max(start, m.start() - 16):m.start()]
+            words = head.split()
+            word = words[-1].lower().lstrip("([") if words else ""
+            marker = word.isdigit() and (len(words) == 1 or "\n" in head[:head.rfind(words[-1])])
+            if word in _ABBREVIATIONS or len(word) == 1 or marker:
+                continue
+        if text[start:m.end()].strip():
+            yield start, m.end()
+        start = m.end()
+    if text[start:].strip():
+        yield start, len(text)
+
+
+def sliding_window_chunks(
+    text: str,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> Iterator[str]:
+    """
+    Sentence-aligned windows of at most `max_tokens` whitespace tokens; each
+    window repeats the trailing sentences of the previous one, up to
+    `overlap_tokens`. Sentences longer than a window are split on token
+    boundaries. Text is tokenized once and windows are slices of the input,
+    so the cost is linear in the document size.
+    """
+    max_tokens = max(1, max_tokens)
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    def units():
+        # (start, end, n_tokens) spans no longer than max_tokens
+        for s, e in iter_sentences(text):
+            toks = [m.span() for m in _TOKEN.finditer(text, s, e)]
+            if not toks:
+                continue
+            step = max(1, max_tokens - overlap_tokens)
+            if len(toks) <= max_tokens:
+                yield toks[0][0], toks[-1][1], len(toks)
+                continue
+            for i in range(0, len(toks), step):
+                piece = toks[i:i + max_tokens]
+                yield piece[0][0], piece[-1][1], len(piece)
+                if i + max_tokens >= len(toks):
+                    break
+
+    window: "deque[Tuple[int, int, int]]" = deque()
+    size = 0
+    fresh = False  # window has content not yet emitted
+    for unit in units():
+        if window and size + unit[2] > max_tokens:
+            if fresh:
+                yield text[window[0][0]:window[-1][1]]
+            while window and (size > overlap_tokens or size + unit[2] > max_tokens):
+                size -= window.popleft()[2]
+            fresh = False
+        window.append(unit)
+        size += unit[2]
+        fresh = True
+    if window and fresh:
+        yield text[window[0][0]:window[-1][1]]
@@ -0,0 +1,196 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from rag_starterkit.rag.metadata_index import COPIES_KEY, encode_copy
+
+# MinHash / LSH parameters: 16 bands x 4 rows puts the LSH candidate knee
+# around Jaccard ~0.5; candidates are then verified against DEDUP_THRESHOLD.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DEDUP_THRESHOLD = 0.85
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM, dtype=np.uint64)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _shingles(text: str, k: int = SHINGLE_SIZE) -> set:
+    norm = unicodedata.normalize("NFKC", text or "").lower()
+    words = _WORD_RE.findall(norm)
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def minhash(text: str) -> np.ndarray:
+    """
+    MinHash signature (NUM_PERM x uint64) over word shingles.
+    """
+    sh = _shingles(text)
+    if not sh:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    hv = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+         for s in sh],
+        dtype=np.uint64,
+    )
+    # (a*x + b) mod p, truncated to 32 bits; uint64 overflow is intentional
+    with np.errstate(over="ignore"):
+        phv = ((np.outer(hv, _PERM_A) + _PERM_B) % _MERSENNE) & _MAX_HASH
+    return phv.min(axis=0)
+
+
+def jaccard_estimate(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures. `find` returns the ID of an indexed
+    chunk whose estimated Jaccard similarity is >= threshold.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._sigs: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(BANDS)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._sigs
+
+    @staticmethod
+    def _band_keys(sig: np.ndarray) -> List[bytes]:
+        return [sig[b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+
+    def find(self, sig: np.ndarray, exclude: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            best, best_score = None, self.threshold
+            seen = set()
+            for b, key in enumerate(self._band_keys(sig)):
+                for cand in self._buckets[b].get(key, ()):
+                    if cand == exclude or cand in seen:
+                        continue
+                    seen.add(cand)
+                    score = jaccard_estimate(sig, self._sigs[cand])
+                    if score >= best_score:
+                        best, best_score = cand, score
+            return best
+
+    def add(self, doc_id: str, sig: np.ndarray) -> None:
+        with self._lock:
+            old = self._sigs.pop(doc_id, None)
+            if old is not None:
+                for b, key in enumerate(self._band_keys(old)):
+                    self._buckets[b].get(key, set()).discard(doc_id)
+            self._sigs[doc_id] = sig
+            for b, key in enumerate(self._band_keys(sig)):
+                self._buckets[b].setdefault(key, set()).add(doc_id)
+
+
+def _source_of(doc: Dict) -> str:
+    meta = doc.get("metadata") or {}
+    src = meta.get("source_path") or meta.get("doc_id") or doc["id"]
+    page = meta.get("page_start")
+    return f"{src}#p{page}" if page is not None else str(src)
+
+
+def dedup_documents(
+    docs: List[Dict],
+    index: Optional[NearDuplicateIndex] = None,
+) -> Tuple[List[Dict], Dict[str, List[Dict]], Dict]:
+    """
+    Collapse near-duplicate chunks into one canonical chunk.
+
+    Returns (canonical_docs, stored_dupes, stats):
+    - canonical_docs: docs to store; each canonical carries metadata
+      "provenance" (sources of every copy) and "duplicate_ids", plus "copies"
+      (see metadata_index.copy_metadata) once a copy is folded in, so copies
+      from other banks, documents or pages stay reachable by filters
+    - stored_dupes: {already-indexed canonical id: [new duplicate docs]} for
+      copies of chunks stored by an earlier ingest
+    - stats: {"input", "stored", "collapsed"}
+
+    `index` (optional) holds signatures of previously stored chunks and is
+    updated in place with the new canonicals.
+    """
+    index = index if index is not None else NearDuplicateIndex()
+    batch: Dict[str, Dict] = {}
+    stored_dupes: Dict[str, List[Dict]] = {}
+    canonical: List[Dict] = []
+
+    for d in docs:
+        sig = minhash(d["text"])
+        match = index.find(sig, exclude=d["id"])
+
+        if match is None:
+            meta = dict(d.get("metadata") or {})
+            meta["provenance"] = [_source_of(d)]
+            meta["duplicate_ids"] = []
+            doc = {**d, "metadata": meta}
+            canonical.append(doc)
+            batch[d["id"]] = doc
+            index.add(d["id"], sig)
+        elif match in batch:
+            meta = batch[match]["metadata"]
+            src = _source_of(d)
+            if src not in meta["provenance"]:
+                meta["provenance"].append(src)
+            meta["duplicate_ids"].append(d["id"])
+            meta.setdefault(COPIES_KEY, [encode_copy(meta)]).append(encode_copy(d.get("metadata")))
+        else:
+            stored_dupes.setdefault(match, []).append(d)
+
+    stats = {
+        "input": len(docs),
+        "stored": len(canonical),
+        "collapsed": len(docs) - len(canonical),
+    }
+    return canonical, stored_dupes, stats
+
+
+def mmr_select(
+    query_vec: np.ndarray,
+    cand_vecs: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7,
+) -> List[int]:
+    """
+    Maximal Marginal Relevance over cosine similarity.
+    Returns indices into cand_vecs in selection order.
+    """
+    n = len(cand_vecs)
+    if n == 0 or k <= 0:
+        return []
+    vecs = np.asarray(cand_vecs, dtype=np.float32)
+    vecs = vecs / (np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-12)
+    q = np.asarray(query_vec, dtype=np.float32)
+    q = q / (np.linalg.norm(q) + 1e-12)
+
+    relevance = vecs @ q
+    if lambda_mult >= 1.0:
+        return [int(i) for i in np.argsort(-relevance)[:k]]
+
+    selected = [int(np.argmax(relevance))]
+    max_sim = vecs @ vecs[selected[0]]
+    while len(selected) < min(k, n):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_sim
+        scores[selected] = -np.inf
+        nxt = int(np.argmax(scores))
+        selected.append(nxt)
+        max_sim = np.maximum(max_sim, vecs @ vecs[nxt])
+    return selected
@@ -1,13 +1,219 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from rag_starterkit.core.config import get_settings, on_reload
+from rag_starterkit.rag.query_cache import QueryEmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+_settings = get_settings()
+
+MODEL_NAME = _settings.embed_model
+
+# torch | onnx (ONNX Runtime on CPU; set RAG_EMBED_ONNX_FILE for a quantized
+# export such as onnx/model_qint8_avx512_vnni.onnx)
+EMBED_BACKEND = _settings.embed_backend
+EMBED_ONNX_FILE = _settings.embed_onnx_file
+EMBED_THREADS = _settings.embed_threads  # intra-op threads, 0 = library default
+
+# Dynamic batching (max_batch / max_wait_ms are hot-reloadable)
+EMBED_WORKERS = _settings.embed_workers
+EMBED_MAX_BATCH = _settings.embed_max_batch
+EMBED_MAX_WAIT_MS = _settings.embed_max_wait_ms
+
+QUERY_CACHE_SIZE = _settings.query_cache_size
+
+# Lower value = served first
+PRIORITY_QUERY = 0
+PRIORITY_INGEST = 1
+
 _model = None
+_model_lock = threading.Lock()
+
+
+def embedding_model_id() -> str:
+    """
+    Identifies the vectors produced; cached query embeddings are only valid
+    for the model id they were computed with.
+    """
+    return f"{MODEL_NAME}|{EMBED_BACKEND}|{EMBED_ONNX_FILE}"
+
+
+def _load_model():
+    if EMBED_BACKEND == "onnx":
+        model_kwargs = {"provider": "CPUExecutionProvider"}
+        if EMBED_ONNX_FILE:
+            model_kwargs["file_name"] = EMBED_ONNX_FILE
+        if EMBED_THREADS > 0:
+            import onnxruntime as ort
+
+            opts = ort.SessionOptions()
+            opts.intra_op_num_threads = EMBED_THREADS
+            model_kwargs["session_options"] = opts
+        return SentenceTransformer(MODEL_NAME, backend="onnx", model_kwargs=model_kwargs)
+
+    if EMBED_THREADS > 0:
+        import torch
+
+        torch.set_num_threads(EMBED_THREADS)
+    return SentenceTransformer(MODEL_NAME)
+
 
 def get_embedding_model():
     global _model
     if _model is None:
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        with _model_lock:
+            if _model is None:
+                _model = _load_model()
     return _model
 
-def embed_texts(texts: list[str]):
-    model = get_embedding_model()
-    return model.encode(texts, show_progress_bar=False)
+
+class _Request:
+    __slots__ = ("texts", "future")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+
+class EmbeddingService:
+    """
+    In-process embedding service: worker threads own the model and drain a
+    priority queue. Requests of the same priority are merged into one
+    `encode` call of up to `max_batch` texts, waiting at most `max_wait_ms`
+    for the batch to fill. Query traffic is always dequeued before ingest
+    work, and large ingest requests are split so queries can interleave.
+    """
+
+    def __init__(
+        self,
+        model_loader=get_embedding_model,
+        workers: int = EMBED_WORKERS,
+        max_batch: int = EMBED_MAX_BATCH,
+        max_wait_ms: float = EMBED_MAX_WAIT_MS,
+    ):
+        self._model_loader = model_loader
+        self.configure(max_batch, max_wait_ms)
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"rag-embed-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def configure(self, max_batch: int, max_wait_ms: float) -> None:
+        """
+        Change batching limits; takes effect from the next batch.
+        """
+        self._max_batch = max(1, max_batch)
+        self._max_wait = max_wait_ms / 1000.0
+
+    def submit(self, texts: list[str], priority: int = PRIORITY_INGEST) -> list[Future]:
+        futures = []
+        for i in range(0, len(texts), self._max_batch):
+            req = _Request(texts[i:i + self._max_batch])
+            self._queue.put((priority, next(self._seq), req))
+            futures.append(req.future)
+        return futures
+
+    def encode(self, texts: list[str], priority: int = PRIORITY_INGEST) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        parts = [f.result() for f in self.submit(texts, priority)]
+        return parts[0] if len(parts) == 1 else np.vstack(parts)
+
+    def _next_batch(self) -> list[_Request]:
+        priority, _, first = self._queue.get()
+        batch, size = [first], len(first.texts)
+        deadline = time.monotonic() + self._max_wait
+
+        while size < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            # Only merge same-priority work that still fits; anything else goes back
+            if item[0] != priority or size + len(item[2].texts) > self._max_batch:
+                self._queue.put(item)
+                break
+            batch.append(item[2])
+            size += len(item[2].texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            texts = [t for r in batch for t in r.texts]
+            try:
+                model = self._model_loader()
+                # Unit vectors: Chroma's L2 distance then maps to cosine
+                # (vectorstore.similarity_score) whatever model/export is used
+                vecs = np.asarray(
+                    model.encode(
+                        texts, batch_size=len(texts), show_progress_bar=False, normalize_embeddings=True
+                    )
+                )
+            except Exception as e:
+                logger.exception("Embedding batch of %d texts failed", len(texts))
+                for r in batch:
+                    r.future.set_exception(e)
+                continue
+
+            offset = 0
+            for r in batch:
+                r.future.set_result(vecs[offset:offset + len(r.texts)])
+                offset += len(r.texts)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService()
+    return _service
+
+
+def embed_texts(texts: list[str], priority: int = PRIORITY_INGEST):
+    return get_embedding_service().encode(texts, priority=priority)
+
+
+query_cache = QueryEmbeddingCache(maxsize=QUERY_CACHE_SIZE)
+
+
+def embed_query(text: str):
+    """
+    Embed a (normalized) query through the LRU cache; misses go to the
+    embedding service at query priority.
+    """
+    return query_cache.get_or_compute(
+        embedding_model_id(),
+        text,
+        lambda norm: embed_texts([norm], priority=PRIORITY_QUERY)[0],
+    )
+
+
+def _apply_settings(settings, changed) -> None:
+    if "query_cache_size" in changed:
+        query_cache.resize(settings.query_cache_size)
+    if {"embed_max_batch", "embed_max_wait_ms"} & set(changed) and _service is not None:
+        _service.configure(settings.embed_max_batch, settings.embed_max_wait_ms)
+
+
+on_reload(_apply_settings)
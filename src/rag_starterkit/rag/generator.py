@@ -1,21 +1,139 @@
+import asyncio
+import re
 from typing import List, Dict, Tuple
-from requests.exceptions import ReadTimeout, ConnectionError
+import httpx
 
 from rag_starterkit.api.schemas import Citation, AnswerQuality
+from rag_starterkit.core.concurrency import run_in_executor, search_executor
+from rag_starterkit.core.config import get_settings
+from rag_starterkit.rag.provenance import get_provenance_store, snippet_window
+from rag_starterkit.rag.shards import DEFAULT_TENANT
 from rag_starterkit.rag.prompt import build_rag_prompt
-from rag_starterkit.llm.ollama_client import generate_llm_answer
+from rag_starterkit.llm.ollama_client import generate_llm_answer, stream_llm_answer
 from rag_starterkit.llm.qwen_judge import judge_answer
-from rag_starterkit.llm.safety import SAFE_REFUSAL_MESSAGE
+from rag_starterkit.llm.safety import (
+    LLM_UNAVAILABLE_MESSAGE,
+    NO_CONTEXT_MESSAGE,
+    SAFE_REFUSAL_MESSAGE,
+)
 
-def generate_answer(
+# Judge modes (settings.judge_mode, hot-reloadable):
+# sequential: generate, then judge the full answer (original behaviour)
+# skip_canned: as sequential, but canned/error answers skip the judge
+# streaming:  stream generation and judge each sentence as soon as it completes
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_RISK_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+
+def _is_canned(answer: str) -> bool:
+    return answer.strip().strip('"') in (NO_CONTEXT_MESSAGE, LLM_UNAVAILABLE_MESSAGE)
+
+
+def _merge_sentence_judgements(sentences: List[str], results: List[Dict]) -> Dict:
+    """
+    Combine per-sentence verdicts: length-weighted groundedness/confidence,
+    worst-case hallucination risk, all unsupported points.
+    """
+    weights = [max(1, len(s)) for s in sentences]
+    total = sum(weights)
+    return {
+        "groundedness": sum(w * float(r.get("groundedness", 0.0)) for w, r in zip(weights, results)) / total,
+        "confidence": sum(w * float(r.get("confidence", 0.0)) for w, r in zip(weights, results)) / total,
+        "hallucination_risk": max(
+            (r.get("hallucination_risk", "high") for r in results),
+            key=lambda x: _RISK_ORDER.get(x, 2),
+        ),
+        "unsupported_points": [p for r in results for p in r.get("unsupported_points", [])],
+    }
+
+
+def build_citations(query: str, contexts: List[Dict]) -> List[Citation]:
+    """
+    Citations with page span / title path from the provenance store and a
+    query-relevant snippet window (falls back to the context text).
+    """
+    store = get_provenance_store()
+    ids_by_tenant: Dict[str, List[str]] = {}
+    for c in contexts:
+        ids_by_tenant.setdefault(c.get("tenant") or DEFAULT_TENANT, []).append(c["id"])
+    records = {
+        (tenant, cid): rec
+        for tenant, ids in ids_by_tenant.items()
+        for cid, rec in store.lookup(tenant, ids).items()
+    }
+
+    citations = []
+    for c in contexts:
+        rec = records.get((c.get("tenant") or DEFAULT_TENANT, c["id"]))
+        text = (store.text(rec) if rec else "") or c["text"] or ""
+        citations.append(Citation(
+            source_id=c["id"],
+            snippet=snippet_window(text, query),
+            source_path=rec["source_path"] if rec else None,
+            page_start=rec["page_start"] if rec else None,
+            page_end=rec["page_end"] if rec else None,
+            title_path=rec["title_path"] if rec else [],
+            score=c.get("score"),
+        ))
+    return citations
+
+
+async def _generate_streaming(prompt: str, contexts: List[Dict]) -> Tuple[str, Dict | None]:
+    """
+    Stream the answer; every completed sentence is handed to the judge
+    immediately, so judging overlaps with the rest of generation.
+    """
+    buf, parts, sentences, judges = "", [], [], []
+
+    def _judge(sentence: str):
+        sentences.append(sentence)
+        judges.append(asyncio.create_task(judge_answer(sentence, contexts)))
+
+    try:
+        try:
+            async for piece in stream_llm_answer(prompt):
+                parts.append(piece)
+                buf += piece
+                *done, buf = _SENTENCE_END.split(buf)
+                for s in done:
+                    if s.strip():
+                        _judge(s.strip())
+        except (httpx.TimeoutException, httpx.ConnectError):
+            return LLM_UNAVAILABLE_MESSAGE, None
+
+        answer = "".join(parts).strip()
+        if not answer or _is_canned(answer):
+            # Nothing to judge (an empty stream has no sentences to weight)
+            return answer, None
+
+        if buf.strip():
+            _judge(buf.strip())
+        results = await asyncio.gather(*judges)
+        return answer, _merge_sentence_judgements(sentences, results)
+    finally:
+        # Deadline cancellation, stream errors and canned answers must not
+        # leave judge calls running against Ollama
+        pending = [t for t in judges if not t.done()]
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def generate_answer(
     query: str,
-    contexts: List[Dict]
-) -> Tuple[str, List[Citation], AnswerQuality]:
+    contexts: List[Dict],
+    mode: str | None = None,
+) -> Tuple[str, List[Citation], AnswerQuality | None]:
+
+    mode = mode or get_settings().judge_mode
 
-    # Case 1: No retrieved context → safe refusal
+    # Case 1: No retrieved context (or none passed the adaptive score
+    # cutoffs) → safe refusal, no LLM or judge call
     if not contexts:
         return (
-            "I do not have sufficient information from the provided documents.",
+            NO_CONTEXT_MESSAGE,
             [],
             AnswerQuality(
                 groundedness=0.0,
@@ -26,41 +144,43 @@ def generate_answer(
         )
 
     # -----------------------------
-    # 1) Generate answer (Qwen2.5)
+    # 1) Build citations (off-loop, overlaps with generation)
     # -----------------------------
-    prompt = build_rag_prompt(query, contexts)
-
-    try:
-        answer = generate_llm_answer(prompt).strip()
-    except (ReadTimeout, ConnectionError):
-        answer = (
-            "The language model did not respond in time. "
-            "Please try again or reduce the query scope."
-        )
+    citations_task = asyncio.ensure_future(
+        run_in_executor(search_executor, build_citations, query, contexts)
+    )
 
     # -----------------------------
-    # 2) Build citations
+    # 2) Generate + judge (Qwen2.5)
     # -----------------------------
-    citations = [
-        Citation(
-            source_id=c["id"],
-            snippet=(c["text"] or "")[:300]
-        )
-        for c in contexts
-    ]
+    prompt = build_rag_prompt(query, contexts)
+
+    if mode == "streaming":
+        answer, judge_result = await _generate_streaming(prompt, contexts)
+    else:
+        try:
+            answer = (await generate_llm_answer(prompt)).strip()
+        except (httpx.TimeoutException, httpx.ConnectError):
+            answer = LLM_UNAVAILABLE_MESSAGE
+
+        if mode != "sequential" and _is_canned(answer):
+            judge_result = None
+        else:
+            judge_result = await judge_answer(answer, contexts)
+
+    citations = await citations_task
+
+    # Canned/error answers are returned as-is, unjudged
+    if judge_result is None:
+        return answer, citations, None
 
-    # -----------------------------
-    # 3) Judge answer (Qwen2.5)
-    # -----------------------------
-    judge_result = judge_answer(answer, contexts)
     quality = AnswerQuality(**judge_result)
 
     # -----------------------------
-    # 4) Auto-reject unsafe answers
+    # 3) Auto-reject unsafe answers
     # -----------------------------
     if quality.hallucination_risk == "high":
         quality.rejected = True
         return SAFE_REFUSAL_MESSAGE, citations, quality
 
     return answer, citations, quality
-
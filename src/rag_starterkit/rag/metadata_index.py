@@ -0,0 +1,293 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Metadata fields that get an exact-match posting list
+INDEXED_FIELDS = ("doc_id", "bank", "section_type", "policy_topic")
+
+# Prefix used to store concept tags as boolean metadata flags (Chroma metadata
+# values must be scalars, so a list of tags cannot be filtered on directly)
+TAG_PREFIX = "tag_"
+
+# Dedup records every copy folded into a canonical chunk under COPIES_KEY as
+# "bank|doc_id|page_start|page_end" entries. They are expanded into flags for
+# the copies' banks/doc_ids and numbered page spans, so filters on a copy's
+# metadata still find the canonical chunk.
+COPIES_KEY = "copies"
+COPY_FLAG_PREFIXES = {"bank": "in_bank_", "doc_id": "in_doc_"}
+COPY_SPAN_PREFIX = "copy_page_"
+# Beyond this many disjoint spans, the last one is widened to cover the rest
+MAX_COPY_SPANS = 8
+# (start, end) metadata keys of a chunk's own page span and its copies' spans
+PAGE_SPAN_KEYS = [("page_start", "page_end")] + [
+    (f"{COPY_SPAN_PREFIX}start_{i}", f"{COPY_SPAN_PREFIX}end_{i}") for i in range(MAX_COPY_SPANS)
+]
+
+
+def flatten_metadata(doc_id: str, meta: Optional[Dict]) -> Dict:
+    """
+    Convert chunk metadata (as produced by leaf_chunker) into Chroma-safe scalars.
+
+    - lists are joined (title_path -> "A > B", number_path -> "1|1.2")
+    - concept_tags are stored both joined and as tag_<NAME>=True flags
+    - copies are expanded by copy_metadata
+    - None values are dropped
+    """
+    out: Dict = {"source": doc_id}
+    for k, v in (meta or {}).items():
+        if v is None:
+            continue
+        if k == "concept_tags":
+            tags = sorted(set(v))
+            out["concept_tags"] = ",".join(tags)
+            for t in tags:
+                out[f"{TAG_PREFIX}{t}"] = True
+        elif k == COPIES_KEY:
+            out.update(copy_metadata(v))
+        elif k == "title_path":
+            out[k] = " > ".join(v)
+        elif isinstance(v, (list, tuple)):
+            out[k] = "|".join(str(x) for x in v)
+        elif isinstance(v, (str, int, float, bool)):
+            out[k] = v
+        else:
+            out[k] = str(v)
+    return out
+
+
+def encode_copy(meta: Optional[Dict]) -> str:
+    """
+    One COPIES_KEY entry for a chunk with (raw or flattened) metadata `meta`.
+    """
+    meta = meta or {}
+    return "|".join(
+        "" if meta.get(k) is None else str(meta[k]).replace("|", "/").replace(";", ",")
+        for k in ("bank", "doc_id", "page_start", "page_end")
+    )
+
+
+def _copy_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    if len(merged) > MAX_COPY_SPANS:
+        last = MAX_COPY_SPANS - 1
+        merged[last:] = [(merged[last][0], max(e for _, e in merged[last:]))]
+    return merged
+
+
+def copy_metadata(copies: Iterable[str]) -> Dict:
+    """
+    Chroma-safe metadata for a canonical chunk's copies: the joined entries,
+    in_bank_<BANK>/in_doc_<DOC_ID>=True flags and copy_page_start_<i>/
+    copy_page_end_<i> spans.
+    """
+    copies = list(dict.fromkeys(c for c in copies if c))
+    out: Dict = {COPIES_KEY: ";".join(copies)}
+    spans: List[Tuple[int, int]] = []
+    for entry in copies:
+        bank, doc_id, start, end = (entry.split("|") + [""] * 4)[:4]
+        for field, value in (("bank", bank), ("doc_id", doc_id)):
+            if value:
+                out[f"{COPY_FLAG_PREFIXES[field]}{value}"] = True
+        if start:
+            spans.append((int(start), int(end or start)))
+    for i, (start, end) in enumerate(_copy_spans(spans)):
+        out[f"{COPY_SPAN_PREFIX}start_{i}"] = start
+        out[f"{COPY_SPAN_PREFIX}end_{i}"] = end
+    return out
+
+
+def record_copies(meta: Dict, copies: Iterable[str]) -> Dict:
+    """
+    Add `copies` to flattened canonical metadata `meta` (in place). A chunk
+    with no copies recorded yet starts with its own entry.
+    """
+    old = [c for c in str(meta.get(COPIES_KEY) or "").split(";") if c] or [encode_copy(meta)]
+    prefixes = tuple(COPY_FLAG_PREFIXES.values()) + (COPY_SPAN_PREFIX,)
+    for k in [k for k in meta if k.startswith(prefixes)]:
+        del meta[k]
+    meta.update(copy_metadata(old + list(copies)))
+    return meta
+
+
+def build_where(filters: Optional[Dict]) -> Optional[Dict]:
+    """
+    Translate query filters into a Chroma `where` clause.
+
+    Page range filters match chunks whose [page_start, page_end] span overlaps
+    [page_from, page_to]. Bank, doc_id and page filters also match a chunk
+    through the copies recorded on it (see copy_metadata).
+    """
+    if not filters:
+        return None
+
+    clauses: List[Dict] = []
+    for f in INDEXED_FIELDS:
+        if filters.get(f) is not None:
+            clause = {f: filters[f]}
+            if f in COPY_FLAG_PREFIXES:
+                clause = {"$or": [clause, {f"{COPY_FLAG_PREFIXES[f]}{filters[f]}": True}]}
+            clauses.append(clause)
+
+    for tag in filters.get("concept_tags") or []:
+        clauses.append({f"{TAG_PREFIX}{tag}": True})
+
+    page_from, page_to = filters.get("page_from"), filters.get("page_to")
+    if page_from is not None or page_to is not None:
+        overlaps = []
+        for start_key, end_key in PAGE_SPAN_KEYS:
+            overlap = []
+            if page_from is not None:
+                overlap.append({end_key: {"$gte": int(page_from)}})
+            if page_to is not None:
+                overlap.append({start_key: {"$lte": int(page_to)}})
+            overlaps.append(overlap[0] if len(overlap) == 1 else {"$and": overlap})
+        clauses.append({"$or": overlaps})
+
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+class MetadataIndex:
+    """
+    Local inverted index over chunk metadata.
+
+    Resolves filters to a candidate ID set without touching the vector store.
+    With `keep_vectors`, candidate embeddings are also held in memory so small
+    filtered scopes can be scored exactly without a round-trip to Chroma.
+    """
+
+    def __init__(self, keep_vectors: bool = False):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, Set[str]]] = {f: {} for f in INDEXED_FIELDS}
+        self._tags: Dict[str, Set[str]] = {}
+        # page number -> ids whose [page_start, page_end] covers it
+        self._page_postings: Dict[int, Set[str]] = {}
+        self._ids: Set[str] = set()
+        # id -> posting sets it was added to, so re-adding an id is O(its keys)
+        self._keys: Dict[str, List[Set[str]]] = {}
+        # Embeddings as rows of one growable matrix (id -> row)
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._used_rows = 0
+        self.keep_vectors = keep_vectors
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(
+        self,
+        ids: Iterable[str],
+        metadatas: Iterable[Optional[Dict]],
+        embeddings: Optional[Sequence] = None,
+    ) -> None:
+        ids = list(ids)
+        if embeddings is None or not self.keep_vectors:
+            vectors: Iterable = [None] * len(ids)
+        else:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            for doc_id, meta, vec in zip(ids, metadatas, vectors):
+                self._remove_locked(doc_id)
+                meta = meta or {}
+                self._ids.add(doc_id)
+                keys = self._keys[doc_id] = []
+
+                def post(table: Dict, key) -> None:
+                    posting = table.setdefault(key, set())
+                    posting.add(doc_id)
+                    keys.append(posting)
+
+                for f in INDEXED_FIELDS:
+                    v = meta.get(f)
+                    if v is not None:
+                        post(self._postings[f], str(v))
+
+                for k, v in meta.items():
+                    if v is not True:
+                        continue
+                    if k.startswith(TAG_PREFIX):
+                        post(self._tags, k[len(TAG_PREFIX):])
+                    for f, prefix in COPY_FLAG_PREFIXES.items():
+                        if k.startswith(prefix):
+                            post(self._postings[f], k[len(prefix):])
+
+                for start_key, end_key in PAGE_SPAN_KEYS:
+                    if start_key in meta:
+                        start = int(meta[start_key])
+                        end = int(meta.get(end_key, start))
+                        for page in range(start, max(start, end) + 1):
+                            post(self._page_postings, page)
+
+                if vec is not None:
+                    self._put_vector_locked(doc_id, vec)
+                else:
+                    self._rows.pop(doc_id, None)
+
+    def _put_vector_locked(self, doc_id: str, vec: np.ndarray) -> None:
+        row = self._rows.get(doc_id)
+        if row is None:
+            if self._matrix is None:
+                self._matrix = np.empty((1024, len(vec)), dtype=np.float32)
+            elif self._used_rows == len(self._matrix):
+                self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+            row = self._rows[doc_id] = self._used_rows
+            self._used_rows += 1
+        self._matrix[row] = vec
+
+    def _remove_locked(self, doc_id: str) -> None:
+        if doc_id not in self._ids:
+            return
+        self._ids.discard(doc_id)
+        for posting in self._keys.pop(doc_id, ()):
+            posting.discard(doc_id)
+
+    def vectors(self, ids: Sequence[str]) -> Optional[np.ndarray]:
+        """
+        Embeddings for `ids` (one row each), or None if any of them is not held.
+        """
+        with self._lock:
+            rows = [self._rows.get(i) for i in ids]
+            if not rows or None in rows:
+                return None
+            return self._matrix[rows]
+
+    def candidates(self, filters: Dict) -> Set[str]:
+        """
+        Return IDs matching every filter (AND semantics).
+        Smallest posting lists are intersected first.
+        """
+        with self._lock:
+            sets: List[Set[str]] = []
+            for f in INDEXED_FIELDS:
+                if filters.get(f) is not None:
+                    sets.append(self._postings[f].get(str(filters[f]), set()))
+            for tag in filters.get("concept_tags") or []:
+                sets.append(self._tags.get(tag, set()))
+
+            page_from = filters.get("page_from")
+            page_to = filters.get("page_to")
+            if page_from is not None or page_to is not None:
+                lo = int(page_from) if page_from is not None else float("-inf")
+                hi = int(page_to) if page_to is not None else float("inf")
+                sets.append(set().union(*(
+                    ids for page, ids in self._page_postings.items() if lo <= page <= hi
+                )))
+
+            if not sets:
+                return set(self._ids)
+            sets.sort(key=len)
+            out = set(sets[0])
+            for s in sets[1:]:
+                out &= s
+                if not out:
+                    break
+            return out
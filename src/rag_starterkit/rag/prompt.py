@@ -1,3 +1,5 @@
+from rag_starterkit.llm.safety import NO_CONTEXT_MESSAGE
+
 def build_rag_prompt(query: str, contexts: list[dict]) -> str:
     context_block = "\n\n".join(
         [f"Source {i+1}:\n{c['text']}" for i, c in enumerate(contexts)]
@@ -8,7 +10,7 @@ You are a banking compliance assistant.
 
 Answer the question strictly using the provided sources.
 If the answer is not present in the sources, say:
-"I do not have sufficient information from the provided documents."
+"{NO_CONTEXT_MESSAGE}"
 
 Sources:
 {context_block}
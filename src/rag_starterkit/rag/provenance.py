@@ -0,0 +1,211 @@
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# Use an absolute path to avoid "working directory" surprises
+BASE_DIR = os.path.abspath(os.getcwd())
+PROVENANCE_DIR = os.path.join(BASE_DIR, ".provenance")
+
+SNIPPET_CHARS = 300
+_LOOKUP_BATCH = 500
+_TERM_RE = re.compile(r"\w{3,}")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    tenant      TEXT NOT NULL,
+    chunk_id    TEXT NOT NULL,
+    doc_id      TEXT,
+    source_path TEXT,
+    page_start  INTEGER,
+    page_end    INTEGER,
+    title_path  TEXT,
+    text_file   TEXT NOT NULL,
+    byte_start  INTEGER NOT NULL,
+    byte_end    INTEGER NOT NULL,
+    PRIMARY KEY (tenant, chunk_id)
+) WITHOUT ROWID
+"""
+
+
+class ProvenanceStore:
+    """
+    Chunk ID -> source file, page span, title path and byte offsets into a
+    per-document extracted-text file. Texts are read back through mmap, so
+    citations and snippets never need a Chroma fetch or a PDF re-read.
+    """
+
+    def __init__(self, root: str = PROVENANCE_DIR):
+        self._root = root
+        self._text_dir = os.path.join(root, "text")
+        os.makedirs(self._text_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "provenance.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._lock = threading.Lock()
+        self._maps: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _text_file(tenant: str, doc_key: str) -> str:
+        return hashlib.sha1(f"{tenant}|{doc_key}".encode("utf-8")).hexdigest()[:16] + ".txt"
+
+    def put(self, tenant: str, docs: Iterable[Dict]) -> None:
+        """
+        Write chunk texts to their document's text file and record offsets.
+
+        Each touched file is rewritten (temp file + os.replace) with the
+        chunks it already holds plus the new ones, so re-ingesting a document
+        replaces its texts instead of appending dead bytes.
+        """
+        rows = []
+        with self._lock:
+            by_file: Dict[str, List[Dict]] = {}
+            for d in docs:
+                meta = d.get("metadata") or {}
+                doc_key = meta.get("doc_id") or meta.get("source_path") or d["id"]
+                by_file.setdefault(self._text_file(tenant, str(doc_key)), []).append(d)
+
+            for fname, group in by_file.items():
+                path = os.path.join(self._text_dir, fname)
+                new_ids = {d["id"] for d in group}
+                kept = [
+                    r for r in self._db.execute(
+                        "SELECT * FROM chunks WHERE tenant = ? AND text_file = ?", (tenant, fname)
+                    )
+                    if r[1] not in new_ids
+                ]
+                old = b""
+                if kept:
+                    with open(path, "rb") as f:
+                        old = f.read()
+
+                offset = 0
+                with open(path + ".tmp", "wb") as f:
+                    for r in kept:
+                        data = old[r[8]:r[9]]
+                        f.write(data)
+                        rows.append((*r[:8], offset, offset + len(data)))
+                        offset += len(data)
+                    for d in group:
+                        data = (d["text"] or "").encode("utf-8")
+                        f.write(data)
+                        meta = d.get("metadata") or {}
+                        title_path = meta.get("title_path")
+                        if isinstance(title_path, (list, tuple)):
+                            title_path = " > ".join(title_path)
+                        rows.append((
+                            tenant, d["id"], meta.get("doc_id"), meta.get("source_path"),
+                            meta.get("page_start"), meta.get("page_end"), title_path,
+                            fname, offset, offset + len(data),
+                        ))
+                        offset += len(data)
+                os.replace(path + ".tmp", path)
+                self._evict(fname)
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+
+    def lookup(self, tenant: str, chunk_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Batched lookup: {chunk_id: record} for the IDs that are known.
+        """
+        out: Dict[str, Dict] = {}
+        with self._lock:
+            for i in range(0, len(chunk_ids), _LOOKUP_BATCH):
+                batch = chunk_ids[i:i + _LOOKUP_BATCH]
+                marks = ",".join("?" * len(batch))
+                cur = self._db.execute(
+                    "SELECT chunk_id, doc_id, source_path, page_start, page_end, title_path, "
+                    f"text_file, byte_start, byte_end FROM chunks WHERE tenant = ? AND chunk_id IN ({marks})",
+                    [tenant, *batch],
+                )
+                for row in cur:
+                    out[row[0]] = {
+                        "chunk_id": row[0],
+                        "doc_id": row[1],
+                        "source_path": row[2],
+                        "page_start": row[3],
+                        "page_end": row[4],
+                        "title_path": row[5].split(" > ") if row[5] else [],
+                        "text_file": row[6],
+                        "byte_start": row[7],
+                        "byte_end": row[8],
+                    }
+        return out
+
+    def _evict(self, fname: str) -> None:
+        cached = self._maps.pop(fname, None)
+        if cached:
+            cached[1].close()
+
+    def _map(self, fname: str) -> Optional[mmap.mmap]:
+        path = os.path.join(self._text_dir, fname)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        cached = self._maps.get(fname)
+        if cached and cached[0] == size:
+            return cached[1]
+        self._evict(fname)
+        if size == 0:
+            return None
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[fname] = (size, mm)
+        return mm
+
+    def text(self, record: Dict) -> str:
+        with self._lock:
+            mm = self._map(record["text_file"])
+            if mm is None:
+                return ""
+            return mm[record["byte_start"]:record["byte_end"]].decode("utf-8", errors="ignore")
+
+
+def snippet_window(text: str, query: str, width: int = SNIPPET_CHARS) -> str:
+    """
+    Pick the `width`-char window of `text` containing the most query-term
+    hits, snapped to word boundaries. Falls back to the head of the text.
+    """
+    text = text or ""
+    if len(text) <= width:
+        return text
+    terms = {t.lower() for t in _TERM_RE.findall(query or "")}
+    lower = text.lower()
+    hits = sorted(m.start() for m in _TERM_RE.finditer(lower) if m.group(0) in terms)
+    if not hits:
+        return text[:width]
+
+    # Two-pointer sweep: densest run of hits that fits in one window
+    best_start, best_count, j = hits[0], 0, 0
+    for i, h in enumerate(hits):
+        while hits[j] < h - width + 40:
+            j += 1
+        if i - j + 1 > best_count:
+            best_count, best_start = i - j + 1, hits[j]
+
+    start = max(0, min(best_start - 40, len(text) - width))
+    end = start + width
+    if start > 0:
+        sp = text.find(" ", start)
+        start = sp + 1 if 0 <= sp < start + 30 else start
+    if end < len(text):
+        sp = text.rfind(" ", start, end)
+        end = sp if sp > start + width // 2 else end
+    return ("…" if start > 0 else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+
+
+_store: Optional[ProvenanceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_provenance_store() -> ProvenanceStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProvenanceStore()
+    return _store
@@ -0,0 +1,107 @@
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form used as the cache key and as the text that gets embedded:
+    NFKC unicode folding, invisible format characters removed (zero-width
+    spaces, BOMs), casefolded, whitespace collapsed. all-MiniLM-L6-v2 is an
+    uncased model, so casefolding does not change the embedding.
+    """
+    q = unicodedata.normalize("NFKC", query or "")
+    q = "".join(ch for ch in q if unicodedata.category(ch) != "Cf")
+    return " ".join(q.casefold().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Thread-safe LRU of (model id, normalized query) -> embedding.
+
+    Concurrent misses for the same key are coalesced onto one computation.
+    Entries are tagged with the model id, and the whole cache is flushed the
+    first time a different model id is seen. The model is not hot-reloadable
+    (embed_model needs a restart), so in a running server this only guards
+    against embedders swapped in-process, e.g. by tests and benchmarks.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._model_id = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, model_id: str, query: str, compute: Callable[[str], np.ndarray]) -> np.ndarray:
+        norm = normalize_query(query)
+        key = (model_id, norm)
+        with self._lock:
+            if model_id != self._model_id:
+                self._flush_locked()
+                self._model_id = model_id
+            vec = self._data.get(key)
+            if vec is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return vec
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._inflight[key] = fut
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            return fut.result()
+
+        try:
+            vec = np.asarray(compute(norm))
+            vec.flags.writeable = False
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.maxsize > 0 and self._model_id == model_id:
+                self._data[key] = vec
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        fut.set_result(vec)
+        return vec
+
+    def _flush_locked(self) -> None:
+        self._data.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > max(0, maxsize):
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "model_id": self._model_id,
+            }
@@ -1,4 +1,53 @@
+from rag_starterkit.core.concurrency import run_in_executor, search_executor
+from rag_starterkit.core.config import get_settings
 from rag_starterkit.rag.vectorstore import query_documents
 
-def retrieve_context(query: str, top_k: int = 4):
-    return query_documents(query, top_k=top_k)
+
+def adaptive_cutoff(contexts: list[dict], min_score: float, max_gap: float) -> list[dict]:
+    """
+    Drop contexts scoring below `min_score`, then cut the rest at the first
+    drop of more than `max_gap` between consecutive scores (best first).
+    Survivors keep their original (MMR) order. An empty result means nothing
+    is relevant enough to answer from.
+    """
+    scores = sorted(
+        (c["score"] for c in contexts if c.get("score") is not None and c["score"] >= min_score),
+        reverse=True,
+    )
+    if not scores:
+        return [c for c in contexts if c.get("score") is None]
+    floor = scores[0]
+    for prev, cur in zip(scores, scores[1:]):
+        if prev - cur > max_gap:
+            break
+        floor = cur
+    return [c for c in contexts if c.get("score") is None or c["score"] >= floor]
+
+
+def retrieve_context(
+    query: str,
+    top_k: int = 4,
+    filters: dict | None = None,
+    tenant: str | None = None,
+    tenants: list[str] | None = None,
+    mmr_lambda: float | None = None,
+    adaptive: bool | None = None,
+):
+    """
+    Top-k contexts (with "score" = cosine similarity), shrunk by the
+    min_score / score_gap cutoffs unless adaptive top_k is disabled.
+    """
+    contexts = query_documents(
+        query, top_k=top_k, filters=filters, tenant=tenant, tenants=tenants, mmr_lambda=mmr_lambda
+    )
+    settings = get_settings()
+    if settings.adaptive_top_k if adaptive is None else adaptive:
+        contexts = adaptive_cutoff(contexts, settings.min_score, settings.score_gap)
+    return contexts
+
+
+async def aretrieve_context(query: str, top_k: int = 4, **kwargs):
+    """
+    Async retrieval: embedding + vector search run on the dedicated search executor.
+    """
+    return await run_in_executor(search_executor, retrieve_context, query, top_k, **kwargs)
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from rag_starterkit.core.config import get_settings
+from rag_starterkit.rag.dedup import NearDuplicateIndex, minhash
+from rag_starterkit.rag.metadata_index import MetadataIndex
+
+DEFAULT_TENANT = "default"
+COLLECTION_PREFIX = "rag_docs"
+
+_TENANT_RE = re.compile(r"^[A-Za-z0-9_-]{1,40}$")
+
+
+def collection_name(tenant: Optional[str]) -> str:
+    """
+    Map a tenant/domain to its collection. The default tenant keeps the
+    original "rag_docs" collection so existing stores keep working.
+    """
+    tenant = tenant or DEFAULT_TENANT
+    if not _TENANT_RE.match(tenant):
+        raise ValueError(f"Invalid tenant name: {tenant!r}")
+    if tenant == DEFAULT_TENANT:
+        return COLLECTION_PREFIX
+    return f"{COLLECTION_PREFIX}__{tenant.lower()}"
+
+
+def tenant_from_collection(name: str) -> Optional[str]:
+    if name == COLLECTION_PREFIX:
+        return DEFAULT_TENANT
+    if name.startswith(f"{COLLECTION_PREFIX}__"):
+        return name[len(COLLECTION_PREFIX) + 2:]
+    return None
+
+
+class Shard:
+    """
+    One tenant's collection handle plus its metadata index and usage stats.
+    """
+
+    def __init__(self, tenant: str, collection):
+        self.tenant = tenant
+        self.collection = collection
+        self.index = MetadataIndex()
+        self.index_loaded = False
+        self.dedup_index: Optional[NearDuplicateIndex] = None
+        self.dedup_stats = {"input": 0, "stored": 0, "collapsed": 0}
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.queries = 0
+        self.upserts = 0
+        self._lock = threading.Lock()
+
+    def ensure_index(self) -> MetadataIndex:
+        """
+        Lazily build the inverted metadata index from what is already stored.
+        Embeddings are loaded into it only when the exact pre-filter path is
+        enabled (prefilter_max_candidates > 0).
+        """
+        if self.index_loaded:
+            return self.index
+        with self._lock:
+            if not self.index_loaded:
+                keep_vectors = get_settings().prefilter_max_candidates > 0
+                self.index = MetadataIndex(keep_vectors=keep_vectors)
+                include = ["metadatas", "embeddings"] if keep_vectors else ["metadatas"]
+                offset, page = 0, 5000
+                while True:
+                    res = self.collection.get(include=include, limit=page, offset=offset)
+                    ids = res.get("ids", [])
+                    if not ids:
+                        break
+                    self.index.add(
+                        ids, res.get("metadatas") or [None] * len(ids),
+                        res.get("embeddings") if keep_vectors else None,
+                    )
+                    offset += len(ids)
+                self.index_loaded = True
+        return self.index
+
+    def ensure_dedup_index(self) -> NearDuplicateIndex:
+        """
+        Lazily seed the near-duplicate index with signatures of stored chunks,
+        so copies arriving in later ingests collapse onto them.
+        """
+        if self.dedup_index is not None:
+            return self.dedup_index
+        with self._lock:
+            if self.dedup_index is None:
+                idx = NearDuplicateIndex()
+                offset, page = 0, 1000
+                while True:
+                    res = self.collection.get(include=["documents"], limit=page, offset=offset)
+                    ids = res.get("ids", [])
+                    if not ids:
+                        break
+                    for doc_id, doc in zip(ids, res.get("documents") or []):
+                        idx.add(doc_id, minhash(doc or ""))
+                    offset += len(ids)
+                self.dedup_index = idx
+        return self.dedup_index
+
+    def stats(self) -> Dict:
+        return {
+            "tenant": self.tenant,
+            "collection": self.collection.name,
+            "loaded": True,
+            "count": self.collection.count(),
+            "indexed_ids": len(self.index) if self.index_loaded else None,
+            "queries": self.queries,
+            "upserts": self.upserts,
+            "dedup": dict(self.dedup_stats),
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+        }
+
+
+class ShardManager:
+    """
+    Loads tenant shards on demand and keeps at most `max_loaded` of them
+    resident, unloading the least recently used one when the cap is hit.
+
+    Unloading drops our handle and metadata index; Chroma's own segment cache
+    (LRU policy + memory limit on the client) releases the vector segments.
+    """
+
+    def __init__(self, client, max_loaded: int = 8):
+        self._client = client
+        self._max_loaded = max(1, max_loaded)
+        self._shards: "OrderedDict[str, Shard]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant: Optional[str], create: bool = False) -> Optional[Shard]:
+        # Collection names are lowercased, so shards are keyed the same way;
+        # "Finance" and "finance" must share one Shard (and its indexes)
+        tenant = (tenant or DEFAULT_TENANT).lower()
+        name = collection_name(tenant)
+        with self._lock:
+            shard = self._shards.get(tenant)
+            if shard is None:
+                if create:
+                    collection = self._client.get_or_create_collection(name=name)
+                else:
+                    try:
+                        collection = self._client.get_collection(name=name)
+                    except Exception:
+                        return None
+                shard = Shard(tenant, collection)
+                self._shards[tenant] = shard
+                while len(self._shards) > self._max_loaded:
+                    self._shards.popitem(last=False)
+            self._shards.move_to_end(tenant)
+            shard.last_used = time.time()
+            return shard
+
+    def unload(self, tenant: str) -> bool:
+        with self._lock:
+            return self._shards.pop(tenant.lower(), None) is not None
+
+    def tenants(self) -> List[str]:
+        """
+        All tenants with a collection on disk (loaded or not).
+        """
+        out = []
+        for c in self._client.list_collections():
+            name = c if isinstance(c, str) else c.name
+            t = tenant_from_collection(name)
+            if t is not None:
+                out.append(t)
+        return sorted(out)
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            loaded = dict(self._shards)
+        out = []
+        for tenant in self.tenants():
+            if tenant in loaded:
+                out.append(loaded[tenant].stats())
+            else:
+                out.append({
+                    "tenant": tenant,
+                    "collection": collection_name(tenant),
+                    "loaded": False,
+                })
+        return out
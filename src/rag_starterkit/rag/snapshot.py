@@ -0,0 +1,215 @@
+"""
+Bulk export/import of the vector store for fast replica bootstrap.
+
+    python -m rag_starterkit.rag.snapshot export snapshots/2024-06-01 [--tenant hr ...]
+    python -m rag_starterkit.rag.snapshot import snapshots/2024-06-01 [--tenant hr ...]
+    python -m rag_starterkit.rag.snapshot verify snapshots/2024-06-01
+
+Layout:
+    manifest.json                  format, embedding model id, dim, per-part rows + sha256
+    <tenant>/part-00000.npz        compressed columns: ids, texts, metadata (JSON),
+                                   embeddings (float32, rows x dim)
+
+String columns are stored as one UTF-8 blob plus int64 offsets, so parts load
+without pickle. Import verifies checksums and the embedding model id, then
+bulk-upserts the stored vectors: nothing is re-parsed or re-embedded.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from rag_starterkit.rag.embeddings import embedding_model_id
+from rag_starterkit.rag.vectorstore import bulk_upsert, iter_documents, list_tenants
+
+FORMAT = "rag-snapshot"
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+PART_ROWS = 5000
+
+
+class SnapshotError(Exception):
+    """Raised for a missing, corrupt or incompatible snapshot."""
+
+
+def _pack(strings: List[str]) -> Dict[str, np.ndarray]:
+    data = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in data], out=offsets[1:])
+    return {"blob": np.frombuffer(b"".join(data), dtype=np.uint8), "offsets": offsets}
+
+
+def _unpack(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    raw = blob.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def write_part(path: str, ids: List[str], texts: List[str], metadatas: List[Dict], embeddings: np.ndarray) -> None:
+    cols = {}
+    for name, values in (
+        ("ids", ids),
+        ("texts", [t or "" for t in texts]),
+        ("meta", [json.dumps(m, ensure_ascii=False, separators=(",", ":")) for m in metadatas]),
+    ):
+        packed = _pack(values)
+        cols[f"{name}_blob"] = packed["blob"]
+        cols[f"{name}_offsets"] = packed["offsets"]
+    cols["embeddings"] = np.ascontiguousarray(embeddings, dtype=np.float32)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **cols)
+
+
+def read_part(path: str):
+    with np.load(path, allow_pickle=False) as z:
+        return (
+            _unpack(z["ids_blob"], z["ids_offsets"]),
+            _unpack(z["texts_blob"], z["texts_offsets"]),
+            [json.loads(m) for m in _unpack(z["meta_blob"], z["meta_offsets"])],
+            z["embeddings"],
+        )
+
+
+def export_snapshot(out_dir: str, tenants: Optional[Iterable[str]] = None, part_rows: int = PART_ROWS) -> Dict:
+    """
+    Dump the given tenants (default: every shard on disk) to `out_dir`.
+    """
+    if os.path.exists(os.path.join(out_dir, MANIFEST)):
+        raise SnapshotError(f"{out_dir} already contains a snapshot")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "created_at": time.time(),
+        "embedding_model": embedding_model_id(),
+        "dim": None,
+        "tenants": {},
+    }
+
+    for tenant in list(tenants or list_tenants()):
+        tdir = os.path.join(out_dir, tenant)
+        os.makedirs(tdir, exist_ok=True)
+        parts, rows = [], 0
+        for ids, texts, metas, vecs in iter_documents(tenant, page_size=part_rows):
+            if len(ids) and manifest["dim"] is None:
+                manifest["dim"] = int(vecs.shape[1])
+            rel = f"{tenant}/part-{len(parts):05d}.npz"
+            path = os.path.join(out_dir, rel)
+            write_part(path, ids, texts, metas, vecs)
+            parts.append({"file": rel, "rows": len(ids), "sha256": _sha256(path)})
+            rows += len(ids)
+        manifest["tenants"][tenant] = {"rows": rows, "parts": parts}
+
+    # Manifest last: a snapshot without one is incomplete
+    tmp = os.path.join(out_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+    return manifest
+
+
+def load_manifest(snap_dir: str) -> Dict:
+    path = os.path.join(snap_dir, MANIFEST)
+    if not os.path.exists(path):
+        raise SnapshotError(f"No {MANIFEST} in {snap_dir}")
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT or manifest.get("version") != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format: {manifest.get('format')} v{manifest.get('version')}")
+    return manifest
+
+
+def verify_snapshot(snap_dir: str) -> Dict:
+    """
+    Check every part's checksum; raises SnapshotError on the first mismatch.
+    """
+    manifest = load_manifest(snap_dir)
+    for tenant, info in manifest["tenants"].items():
+        for part in info["parts"]:
+            path = os.path.join(snap_dir, part["file"])
+            if not os.path.exists(path) or _sha256(path) != part["sha256"]:
+                raise SnapshotError(f"Checksum mismatch for {part['file']}")
+    return manifest
+
+
+def import_snapshot(
+    snap_dir: str,
+    tenants: Optional[Iterable[str]] = None,
+    allow_model_mismatch: bool = False,
+) -> Dict:
+    """
+    Restore a snapshot into the local store. Parts are checksummed and
+    decompressed on a background thread while the previous part is upserted.
+    Returns {tenant: rows loaded}.
+    """
+    manifest = load_manifest(snap_dir)
+    if manifest["embedding_model"] != embedding_model_id() and not allow_model_mismatch:
+        raise SnapshotError(
+            f"Snapshot vectors come from {manifest['embedding_model']!r}, "
+            f"this node embeds queries with {embedding_model_id()!r}"
+        )
+    wanted = list(tenants or manifest["tenants"])
+    missing = [t for t in wanted if t not in manifest["tenants"]]
+    if missing:
+        raise SnapshotError(f"Tenants not in snapshot: {missing}")
+
+    def _load(part: Dict):
+        path = os.path.join(snap_dir, part["file"])
+        if _sha256(path) != part["sha256"]:
+            raise SnapshotError(f"Checksum mismatch for {part['file']}")
+        return read_part(path)
+
+    jobs = [(t, p) for t in wanted for p in manifest["tenants"][t]["parts"]]
+    loaded = {t: 0 for t in wanted}
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-snapshot") as pool:
+        pending = pool.submit(_load, jobs[0][1]) if jobs else None
+        for i, (tenant, _) in enumerate(jobs):
+            ids, texts, metas, vecs = pending.result()
+            if i + 1 < len(jobs):
+                pending = pool.submit(_load, jobs[i + 1][1])
+            bulk_upsert(ids, texts, metas, vecs, tenant=tenant)
+            loaded[tenant] += len(ids)
+    return loaded
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vector store snapshot export/import")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="Dump ids, texts, metadata and vectors")
+    ex.add_argument("out_dir")
+    ex.add_argument("--tenant", action="append", help="Repeatable; default: all tenants")
+    ex.add_argument("--part-rows", type=int, default=PART_ROWS)
+    im = sub.add_parser("import", help="Bulk-load a snapshot (no re-embedding)")
+    im.add_argument("snap_dir")
+    im.add_argument("--tenant", action="append", help="Repeatable; default: all tenants")
+    im.add_argument("--allow-model-mismatch", action="store_true")
+    ve = sub.add_parser("verify", help="Check manifest and checksums")
+    ve.add_argument("snap_dir")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    if args.cmd == "export":
+        manifest = export_snapshot(args.out_dir, args.tenant, args.part_rows)
+        result = {t: info["rows"] for t, info in manifest["tenants"].items()}
+    elif args.cmd == "import":
+        result = import_snapshot(args.snap_dir, args.tenant, args.allow_model_mismatch)
+    else:
+        manifest = verify_snapshot(args.snap_dir)
+        result = {t: info["rows"] for t, info in manifest["tenants"].items()}
+    print(json.dumps({"cmd": args.cmd, "rows": result, "seconds": round(time.perf_counter() - t0, 3)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
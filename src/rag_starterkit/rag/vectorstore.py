@@ -1,65 +1,372 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
-from rag_starterkit.rag.embeddings import embed_texts
+from chromadb.config import Settings
+import numpy as np
+from rag_starterkit.core.config import get_settings
+from rag_starterkit.rag.dedup import dedup_documents, mmr_select
+from rag_starterkit.rag.embeddings import embed_query, embed_texts
+from rag_starterkit.rag.metadata_index import (
+    COPIES_KEY,
+    build_where,
+    encode_copy,
+    flatten_metadata,
+    record_copies,
+)
+from rag_starterkit.rag.provenance import get_provenance_store
+from rag_starterkit.rag.shards import Shard, ShardManager
 
 # Use an absolute path to avoid "working directory" surprises
 BASE_DIR = os.path.abspath(os.getcwd())
 CHROMA_DIR = os.path.join(BASE_DIR, ".chroma")
 
-_client = chromadb.PersistentClient(path=CHROMA_DIR)
-_collection = _client.get_or_create_collection(name="rag_docs")
+# Shard (tenant collection) residency: handle cap + Chroma segment memory cap (0 = unlimited)
+MAX_LOADED_SHARDS = get_settings().max_loaded_shards
+SHARD_MEMORY_LIMIT_BYTES = get_settings().shard_memory_limit_bytes
+FANOUT_WORKERS = get_settings().fanout_workers
 
+# Read per query (hot-reloadable):
+#   prefilter_max_candidates: filtered queries are resolved to candidate IDs
+#     by the shard's metadata index; sets of at most this size are scored
+#     exactly against vectors held in that index, larger ones are searched by
+#     Chroma restricted to the candidate IDs (0 = never exact, and no vectors
+#     are kept in memory). Chroma's `where` filter is not used: on this
+#     version it is ~10x slower than an unfiltered query.
+#   mmr_lambda / mmr_fetch_factor: query-time diversity, MMR re-ranks
+#     top_k * mmr_fetch_factor candidates (lambda 1.0 = off)
 
-def add_documents(docs: list[dict]) -> int:
+
+def _client_settings() -> Settings:
+    if SHARD_MEMORY_LIMIT_BYTES > 0:
+        return Settings(
+            chroma_segment_cache_policy="LRU",
+            chroma_memory_limit_bytes=SHARD_MEMORY_LIMIT_BYTES,
+        )
+    return Settings()
+
+
+_client = chromadb.PersistentClient(path=CHROMA_DIR, settings=_client_settings())
+_shards = ShardManager(_client, max_loaded=MAX_LOADED_SHARDS)
+_fanout_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="rag-fanout")
+
+
+def _joined(value, extra: list[str]) -> str:
+    items = [v for v in (value or "").split("|") if v]
+    for e in extra:
+        if e not in items:
+            items.append(e)
+    return "|".join(items)
+
+
+def _merge_stored_provenance(shard: Shard, stored_dupes: dict[str, list[dict]]) -> None:
+    """
+    Record new copies of already-stored chunks on the stored canonical's metadata
+    (and in the metadata index, so filters on the copies find it).
+    """
+    if not stored_dupes:
+        return
+    ids = list(stored_dupes)
+    res = shard.collection.get(ids=ids, include=["metadatas", "embeddings"])
+    upd_ids, upd_metas = [], []
+    for doc_id, meta in zip(res.get("ids", []), res.get("metadatas") or []):
+        meta = dict(meta or {})
+        dupes = stored_dupes[doc_id]
+        meta["provenance"] = _joined(meta.get("provenance"), [
+            (d.get("metadata") or {}).get("source_path") or d["id"] for d in dupes
+        ])
+        meta["duplicate_ids"] = _joined(meta.get("duplicate_ids"), [d["id"] for d in dupes])
+        record_copies(meta, [encode_copy(d.get("metadata")) for d in dupes])
+        upd_ids.append(doc_id)
+        upd_metas.append(meta)
+    if upd_ids:
+        shard.collection.update(ids=upd_ids, metadatas=upd_metas)
+        if shard.index_loaded:
+            shard.index.add(upd_ids, upd_metas, res.get("embeddings"))
+
+
+def _carry_over_provenance(shard: Shard, ids: list[str], metadatas: list[dict]) -> None:
+    """
+    Re-ingesting a canonical chunk must not drop provenance recorded earlier.
+    """
+    res = shard.collection.get(ids=ids, include=["metadatas"])
+    stored = dict(zip(res.get("ids", []), res.get("metadatas") or []))
+    for doc_id, meta in zip(ids, metadatas):
+        old = stored.get(doc_id)
+        if not old:
+            continue
+        for key in ("provenance", "duplicate_ids"):
+            if old.get(key):
+                meta[key] = _joined(old[key], [v for v in meta.get(key, "").split("|") if v])
+        if old.get(COPIES_KEY):
+            record_copies(meta, old[COPIES_KEY].split(";"))
+
+
+def add_documents(docs: list[dict], tenant: str | None = None, dedup: bool = True) -> int:
     """
-    Upsert documents into Chroma (safe on repeated ingests).
+    Upsert documents into the tenant's collection (safe on repeated ingests).
+    Optional per-doc "metadata" (e.g. leaf_chunker metadata) is stored alongside.
+
+    With dedup, near-duplicate chunks (MinHash, within the batch and against
+    what is already stored) collapse into one canonical chunk whose metadata
+    lists every source in "provenance".
     Returns current collection count.
     """
+    shard = _shards.get(tenant, create=True)
+    if dedup:
+        docs, stored_dupes, stats = dedup_documents(docs, shard.ensure_dedup_index())
+        _merge_stored_provenance(shard, stored_dupes)
+        for k, v in stats.items():
+            shard.dedup_stats[k] += v
+        if not docs:
+            return shard.collection.count()
+
     texts = [d["text"] for d in docs]
     ids = [d["id"] for d in docs]
+    metadatas = [flatten_metadata(d["id"], d.get("metadata")) for d in docs]
+    if dedup:
+        _carry_over_provenance(shard, ids, metadatas)
     embeddings = embed_texts(texts)
 
     # upsert is safer than add (prevents duplicate-id errors)
-    _collection.upsert(
+    shard.collection.upsert(
         documents=texts,
         embeddings=embeddings.tolist(),
         ids=ids,
-        metadatas=[{"source": d["id"]} for d in docs],
+        metadatas=metadatas,
+    )
+    if shard.index_loaded:
+        shard.index.add(ids, metadatas, embeddings)
+    get_provenance_store().put(shard.tenant, docs)
+    shard.upserts += len(ids)
+    return shard.collection.count()
+
+
+def bulk_upsert(
+    ids: list[str],
+    texts: list[str],
+    metadatas: list[dict],
+    embeddings: np.ndarray,
+    tenant: str | None = None,
+) -> int:
+    """
+    Upsert already-embedded, already-flattened records (snapshot restore).
+    No dedup and no embedding; metadata/dedup indexes and the provenance
+    store are kept in step. Returns current collection count.
+    """
+    shard = _shards.get(tenant, create=True)
+    metadatas = [m or None for m in metadatas]  # Chroma rejects empty dicts
+    batch = _client.get_max_batch_size()
+    for i in range(0, len(ids), batch):
+        shard.collection.upsert(
+            ids=ids[i:i + batch],
+            documents=texts[i:i + batch],
+            metadatas=metadatas[i:i + batch],
+            embeddings=embeddings[i:i + batch],
+        )
+    if shard.index_loaded:
+        shard.index.add(ids, metadatas, embeddings)
+    shard.dedup_index = None  # re-seeded lazily on the next deduplicating ingest
+    get_provenance_store().put(
+        shard.tenant, [{"id": i, "text": t, "metadata": m} for i, t, m in zip(ids, texts, metadatas)]
     )
-    return _collection.count()
+    shard.upserts += len(ids)
+    return shard.collection.count()
+
+
+def iter_documents(tenant: str | None = None, page_size: int = 5000):
+    """
+    Yield (ids, texts, metadatas, embeddings) pages of everything stored in a shard.
+    """
+    shard = _shards.get(tenant)
+    if shard is None:
+        return
+    offset = 0
+    while True:
+        res = shard.collection.get(
+            include=["documents", "metadatas", "embeddings"], limit=page_size, offset=offset
+        )
+        ids = res.get("ids", [])
+        if not ids:
+            return
+        metas = res.get("metadatas") or [None] * len(ids)
+        yield (
+            ids,
+            res.get("documents") or [""] * len(ids),
+            [m or {} for m in metas],
+            np.asarray(res["embeddings"], dtype=np.float32),
+        )
+        offset += len(ids)
+
+
+def list_tenants() -> list[str]:
+    return _shards.tenants()
 
 
-def query_documents(query: str, top_k: int = 4) -> list[dict]:
-    query_embedding = embed_texts([query])[0]
+def similarity_score(distance: float | None) -> float | None:
+    """
+    Cosine similarity from Chroma's squared-L2 distance (embeddings are
+    unit-normalized, so d = 2 - 2cos).
+    """
+    return None if distance is None else 1.0 - float(distance) / 2.0
+
+
+def _exact_search(shard: Shard, query_embedding: np.ndarray, ids: list[str], top_k: int) -> list[dict] | None:
+    """
+    Brute-force squared-L2 search (Chroma's default space) over a small
+    candidate set, using the vectors held in the metadata index; only the
+    top_k winners are fetched from Chroma. None if vectors are not held.
+    """
+    vecs = shard.index.vectors(ids)
+    if vecs is None:
+        return None
+    q = np.asarray(query_embedding, dtype=np.float32)
+    dists = ((vecs - q) ** 2).sum(axis=1)
+
+    k = min(top_k, len(ids))
+    top = np.argpartition(dists, k - 1)[:k]
+    top = top[np.argsort(dists[top])]
 
-    results = _collection.query(
+    res = shard.collection.get(ids=[ids[i] for i in top], include=["documents", "metadatas"])
+    found = {
+        doc_id: (doc, meta)
+        for doc_id, doc, meta in zip(
+            res.get("ids", []), res.get("documents") or [], res.get("metadatas") or [],
+        )
+    }
+    out = []
+    for i in top:
+        if ids[i] not in found:
+            continue
+        doc, meta = found[ids[i]]
+        out.append({
+            "id": ids[i],
+            "text": doc,
+            "metadata": meta or {},
+            "distance": float(dists[i]),
+            "score": similarity_score(dists[i]),
+            "tenant": shard.tenant,
+            "embedding": vecs[i],
+        })
+    return out
+
+
+def _search_shard(shard: Shard, query_embedding: np.ndarray, top_k: int, filters: dict | None) -> list[dict]:
+    shard.queries += 1
+
+    candidate_ids = None
+    if build_where(filters) is not None:
+        candidates = shard.ensure_index().candidates(filters)
+        if not candidates:
+            return []
+        candidate_ids = sorted(candidates)
+        if len(candidate_ids) <= get_settings().prefilter_max_candidates:
+            hits = _exact_search(shard, query_embedding, candidate_ids, top_k)
+            if hits is not None:
+                return hits
+
+    results = shard.collection.query(
         query_embeddings=[query_embedding.tolist()],
-        n_results=top_k,
-        include=["documents", "metadatas", "distances"],
+        n_results=min(top_k, len(candidate_ids)) if candidate_ids else top_k,
+        ids=candidate_ids,
+        include=["documents", "metadatas", "distances", "embeddings"],
     )
 
     contexts = []
     ids = results.get("ids", [[]])[0]
     docs = results.get("documents", [[]])[0]
+    metas = (results.get("metadatas") or [[]])[0] or [None] * len(ids)
+    dists = (results.get("distances") or [[]])[0] or [None] * len(ids)
+    embs = results.get("embeddings")
+    embs = embs[0] if embs is not None and len(embs) else [None] * len(ids)
 
-    for doc_id, doc in zip(ids, docs):
-        contexts.append({"id": doc_id, "text": doc})
+    for doc_id, doc, meta, dist, emb in zip(ids, docs, metas, dists, embs):
+        contexts.append({
+            "id": doc_id,
+            "text": doc,
+            "metadata": meta or {},
+            "distance": dist,
+            "score": similarity_score(dist),
+            "tenant": shard.tenant,
+            "embedding": emb,
+        })
 
     return contexts
 
 
-def count_documents() -> int:
-    return _collection.count()
+def _diversify(query_embedding: np.ndarray, contexts: list[dict], top_k: int, mmr_lambda: float) -> list[dict]:
+    vecs = [c.get("embedding") for c in contexts]
+    if mmr_lambda < 1.0 and len(contexts) > top_k and all(v is not None for v in vecs):
+        contexts = [contexts[i] for i in mmr_select(query_embedding, np.asarray(vecs), top_k, mmr_lambda)]
+    else:
+        contexts = contexts[:top_k]
+    for c in contexts:
+        c.pop("embedding", None)
+    return contexts
+
+
+def query_documents(
+    query: str,
+    top_k: int = 4,
+    filters: dict | None = None,
+    tenant: str | None = None,
+    tenants: list[str] | None = None,
+    mmr_lambda: float | None = None,
+) -> list[dict]:
+    """
+    Similarity search, optionally scoped by metadata filters
+    (doc_id, bank, section_type, policy_topic, concept_tags, page_from, page_to).
+
+    `tenant` searches one shard; `tenants` fans out over several shards in
+    parallel ("*" = every shard on disk) and merges hits by distance.
+    Results are diversified with MMR (`mmr_lambda`, 1.0 = pure relevance).
+    """
+    query_embedding = embed_query(query)
+    settings = get_settings()
+    mmr_lambda = settings.mmr_lambda if mmr_lambda is None else mmr_lambda
+    fetch_k = top_k * settings.mmr_fetch_factor if mmr_lambda < 1.0 else top_k
+
+    if not tenants:
+        shard = _shards.get(tenant)
+        if shard is None:
+            return []
+        hits = _search_shard(shard, query_embedding, fetch_k, filters)
+        return _diversify(query_embedding, hits, top_k, mmr_lambda)
 
+    names = _shards.tenants() if "*" in tenants else list(dict.fromkeys(t.lower() for t in tenants))
+    shards = [s for s in (_shards.get(t) for t in names) if s is not None]
+    futures = [
+        _fanout_pool.submit(_search_shard, s, query_embedding, fetch_k, filters)
+        for s in shards
+    ]
+    merged = [c for f in futures for c in f.result()]
+    merged.sort(key=lambda c: c["distance"] if c["distance"] is not None else float("inf"))
+    return _diversify(query_embedding, merged[:fetch_k], top_k, mmr_lambda)
 
-def peek_documents(n: int = 3) -> list[dict]:
+
+def count_documents(tenant: str | None = None) -> int:
+    shard = _shards.get(tenant)
+    return shard.collection.count() if shard else 0
+
+
+def peek_documents(n: int = 3, tenant: str | None = None) -> list[dict]:
     """
     True peek: fetch stored docs directly (no similarity query).
     """
-    res = _collection.get(limit=n, include=["documents", "metadatas"])
+    shard = _shards.get(tenant)
+    if shard is None:
+        return []
+    res = shard.collection.get(limit=n, include=["documents", "metadatas"])
     ids = res.get("ids", [])
     docs = res.get("documents", [])
     out = []
     for doc_id, doc in zip(ids, docs):
         out.append({"id": doc_id, "text": doc})
     return out
+
+
+def shard_stats() -> list[dict]:
+    return _shards.stats()
+
+
+def unload_shard(tenant: str) -> bool:
+    return _shards.unload(tenant)
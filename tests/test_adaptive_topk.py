@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from rag_starterkit.core.config import override_settings
+from rag_starterkit.core.metrics import counters
+from rag_starterkit.llm.safety import NO_CONTEXT_MESSAGE
+from rag_starterkit.main import app
+from rag_starterkit.rag import generator, retriever
+from rag_starterkit.rag.retriever import adaptive_cutoff
+
+client = TestClient(app)
+GOOD = {"groundedness": 0.9, "confidence": 0.9, "hallucination_risk": "low", "unsupported_points": []}
+
+
+def _ctx(*scores):
+    return [{"id": f"c{i}", "text": "Refunds within 14 days.", "score": s} for i, s in enumerate(scores)]
+
+
+def test_cutoff_drops_low_scores_and_tail_after_gap():
+    kept = adaptive_cutoff(_ctx(0.55, 0.82, 0.78, 0.2), min_score=0.25, max_gap=0.15)
+    assert [c["id"] for c in kept] == ["c1", "c2"]  # 0.55 is behind a 0.23 gap; 0.2 is below min_score
+
+    kept = adaptive_cutoff(_ctx(0.7, 0.6, 0.5), min_score=0.25, max_gap=0.15)
+    assert len(kept) == 3
+
+
+def test_query_below_threshold_refuses_without_llm_unless_opted_out(monkeypatch):
+    llm_calls = []
+
+    async def llm(prompt):
+        llm_calls.append(prompt)
+        return "Refunds take 14 days."
+
+    async def judge(answer, contexts):
+        llm_calls.append(answer)
+        return GOOD
+
+    monkeypatch.setattr(retriever, "query_documents", lambda q, **kw: _ctx(0.1, 0.2))
+    monkeypatch.setattr(generator, "generate_llm_answer", llm)
+    monkeypatch.setattr(generator, "judge_answer", judge)
+    before = counters.snapshot().get("no_context_refusals", 0)
+
+    with override_settings(adaptive_top_k=True, min_score=0.25):
+        r = client.post("/v1/query", json={"query": "q"})
+        assert r.json()["answer"] == NO_CONTEXT_MESSAGE and r.json()["citations"] == []
+        assert llm_calls == []
+        assert counters.snapshot()["no_context_refusals"] == before + 1
+
+        r = client.post("/v1/query", json={"query": "q", "adaptive": False})
+        assert r.json()["answer"] == "Refunds take 14 days."
+        assert [c["score"] for c in r.json()["citations"]] == [0.1, 0.2]
+        assert len(llm_calls) == 2  # generation + judge
+
+    # off by default: low scores are still answered
+    client.post("/v1/query", json={"query": "q"})
+    assert len(llm_calls) == 4
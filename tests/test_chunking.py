@@ -0,0 +1,78 @@
+from rag_starterkit.rag.chunking import chunk_faq_text, iter_sentences, sliding_window_chunks
+
+
+def test_faq_scanner_splits_numbered_questions():
+    text = "FAQs\n1. What is CTS?\nCheque Truncation System.\nIt is faster.\n2. What is PPS?\nPositive Pay.\n"
+    chunks = chunk_faq_text(text)
+    assert [c["id"] for c in chunks] == ["faq_1", "faq_2"]
+    assert chunks[0]["text"] == "Q1: What is CTS?\nA: Cheque Truncation System.\nIt is faster."
+
+
+def test_faq_scanner_handles_numbers_on_their_own_line():
+    text = "1.\nWhat is CTS?\nCheque truncation system.\n2.\n\nWhat is PPS?\nPositive Pay.\n"
+    chunks = chunk_faq_text(text)
+    assert [c["text"] for c in chunks] == [
+        "Q1: What is CTS?\nA: Cheque truncation system.",
+        "Q2: What is PPS?\nA: Positive Pay.",
+    ]
+
+
+def test_faq_answers_keep_lines_starting_with_decimals():
+    text = "1. What is the limit?\nThe limit is\n2.5 lakh rupees per day.\n"
+    assert chunk_faq_text(text)[0]["text"] == "Q1: What is the limit?\nA: The limit is\n2.5 lakh rupees per day."
+
+
+def test_faq_scanner_is_linear_on_flat_text():
+    flat = " ".join(f"{i}. Clause on charges." for i in range(50_000))  # no line breaks
+    assert len(chunk_faq_text(flat)) == 1  # ingest re-splits it into windows (below)
+
+
+def test_oversized_faq_chunks_fall_back_to_windows(monkeypatch):
+    from pathlib import Path
+
+    from rag_starterkit.data import ingest
+
+    flat = " ".join(f"{i}. Clause on cheque charges." for i in range(1, 2001))
+    monkeypatch.setattr(ingest, "load_pdf_text", lambda p: flat)
+    docs = ingest._pdf_docs(Path("flat.pdf"), "faq", None)
+
+    assert len(docs) > 1 and docs[0]["id"] == "flat_faq_1_w1"
+    assert all(len(d["text"].split()) <= 320 for d in docs)
+
+
+def test_sentences_skip_abbreviations():
+    text = "Charges are Rs. 100 per cheque. See e.g. Annexure II. Done!"
+    assert [text[s:e].strip() for s, e in iter_sentences(text)] == [
+        "Charges are Rs. 100 per cheque.", "See e.g. Annexure II.", "Done!",
+    ]
+
+
+def test_windows_are_sentence_aligned_with_overlap():
+    sentences = [f"Sentence {i} has exactly six tokens." for i in range(20)]
+    windows = list(sliding_window_chunks(" ".join(sentences), max_tokens=24, overlap_tokens=6))
+
+    assert all(len(w.split()) <= 24 for w in windows)
+    assert all(w.endswith(".") and w.startswith("Sentence") for w in windows)
+    # each window starts with the last sentence of the previous one
+    for prev, cur in zip(windows, windows[1:]):
+        assert prev.endswith(cur.split(".")[0] + ".")
+    assert sentences[-1] in windows[-1]
+
+
+def test_overlong_sentence_is_split_on_tokens():
+    words = [f"w{i}" for i in range(100)]
+    windows = list(sliding_window_chunks(" ".join(words), max_tokens=30, overlap_tokens=5))
+    assert [len(w.split()) for w in windows] == [30, 30, 30, 25]
+    assert windows[1].split()[0] == "w25"
+
+
+def test_faq_ids_are_unique_across_pdfs(monkeypatch):
+    from pathlib import Path
+
+    from rag_starterkit.data import ingest
+
+    monkeypatch.setattr(ingest, "load_pdf_text", lambda p: "1. What is CTS?\nCheque Truncation System.\n")
+    a = ingest._pdf_docs(Path("sbi_faq.pdf"), "faq", "sbi")
+    b = ingest._pdf_docs(Path("hdfc_faq.pdf"), "faq", "hdfc")
+    assert [d["id"] for d in a + b] == ["sbi_faq_faq_1", "hdfc_faq_faq_1"]
+    assert b[0]["metadata"]["doc_id"] == "hdfc_faq"
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from rag_starterkit.core import config
+from rag_starterkit.core.concurrency import AdmissionController
+
+
+@pytest.fixture
+def fresh_settings(monkeypatch, tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("")
+    monkeypatch.setenv("RAG_ENV_FILE", str(env_file))
+    monkeypatch.setattr(config, "_settings", None)
+    monkeypatch.setattr(config, "_listeners", [])
+    return env_file
+
+
+def test_precedence_env_over_file_over_profile(fresh_settings, monkeypatch):
+    fresh_settings.write_text("RAG_ENV=prod\nRAG_QUERY_DEADLINE_S=45\n")
+    monkeypatch.setenv("OLLAMA_URL", "http://ollama:11434/api/generate")
+    monkeypatch.setenv("RAG_MAX_CONCURRENT_QUERIES", "3")
+
+    s = config.get_settings()
+    assert s.env == "prod"
+    assert s.ollama_url == "http://ollama:11434/api/generate"
+    assert s.max_concurrent_queries == 3  # env var beats profile
+    assert s.query_deadline_s == 45.0  # env file beats profile
+    assert s.query_cache_size == 8192  # profile beats default
+
+
+def test_reload_applies_safe_knobs_only(fresh_settings, monkeypatch):
+    seen = []
+    config.on_reload(lambda s, changed: seen.append(changed))
+    config.get_settings()
+
+    fresh_settings.write_text("RAG_MMR_LAMBDA=0.5\nRAG_EMBED_MODEL=other-model\n")
+    result = config.reload_settings()
+
+    assert result == {"applied": {"mmr_lambda": 0.5}, "restart_required": ["embed_model"]}
+    assert seen == [{"mmr_lambda": 0.5}]
+    assert config.get_settings().embed_model == "all-MiniLM-L6-v2"
+    with pytest.raises(ValueError):
+        config.update_settings(embed_workers=4)
+
+
+def test_admission_resize_admits_waiters():
+    async def scenario():
+        ctl = AdmissionController(max_concurrent=1, max_queue=2)
+        release = asyncio.Event()
+
+        async def hold():
+            async with ctl:
+                await release.wait()
+
+        tasks = [asyncio.create_task(hold()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert (ctl.active, ctl.waiting) == (1, 2)
+        ctl.resize(max_concurrent=3, max_queue=0)
+        await asyncio.sleep(0)
+        assert (ctl.active, ctl.waiting) == (3, 0)
+        release.set()
+        await asyncio.gather(*tasks)
+        return ctl.active
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_reloaded_llm_timeout_applies_to_the_pooled_client(fresh_settings, monkeypatch):
+    import httpx
+
+    from rag_starterkit.llm import ollama_client
+
+    seen = []
+
+    def handler(request):
+        seen.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={"response": "ok"})
+
+    async def scenario():
+        monkeypatch.setattr(ollama_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        monkeypatch.setattr(ollama_client, "_client_loop", asyncio.get_running_loop())
+        await ollama_client.generate_llm_answer("p")
+        config.update_settings(llm_timeout_s=7.0)
+        await ollama_client.generate_llm_answer("p")
+
+    asyncio.run(scenario())
+    assert seen == [300.0, 7.0]
@@ -0,0 +1,57 @@
+import numpy as np
+
+from rag_starterkit.rag.dedup import NearDuplicateIndex, dedup_documents, minhash, mmr_select
+from rag_starterkit.rag.metadata_index import flatten_metadata
+
+CLAUSE = (
+    "The paying bank shall return the dishonoured cheque along with a return memo "
+    "indicating the reason for dishonour within the clearing cycle prescribed by RBI. "
+    "Charges for dishonour shall be levied as per the schedule of charges of the bank."
+)
+
+
+def test_near_duplicates_collapse_with_provenance():
+    docs = [
+        {"id": "a:1", "text": CLAUSE, "metadata": {"source_path": "bank_a.pdf", "page_start": 4}},
+        {"id": "b:1", "text": CLAUSE.replace("RBI.", "RBI"), "metadata": {"source_path": "bank_b.pdf"}},
+        {"id": "c:1", "text": "Positive Pay applies to cheques above five lakh rupees."},
+    ]
+    canonical, stored_dupes, stats = dedup_documents(docs)
+
+    assert [d["id"] for d in canonical] == ["a:1", "c:1"]
+    assert canonical[0]["metadata"]["provenance"] == ["bank_a.pdf#p4", "bank_b.pdf"]
+    assert canonical[0]["metadata"]["duplicate_ids"] == ["b:1"]
+    assert stored_dupes == {}
+    assert stats == {"input": 3, "stored": 2, "collapsed": 1}
+
+
+def test_copies_from_other_banks_and_documents_collapse_with_their_metadata():
+    docs = [
+        {"id": "sbi:1", "text": CLAUSE, "metadata": {"bank": "sbi", "doc_id": "cts", "page_start": 2, "page_end": 2}},
+        {"id": "hdfc:1", "text": CLAUSE, "metadata": {"bank": "hdfc", "doc_id": "cts", "page_start": 30, "page_end": 31}},
+        {"id": "sbi:2", "text": CLAUSE, "metadata": {"bank": "sbi", "doc_id": "cts_v2", "page_start": 3, "page_end": 3}},
+    ]
+    canonical, _, stats = dedup_documents(docs)
+    assert [d["id"] for d in canonical] == ["sbi:1"]
+    assert stats["collapsed"] == 2
+
+    flat = flatten_metadata("sbi:1", canonical[0]["metadata"])
+    assert flat["bank"] == "sbi" and flat["in_bank_sbi"] and flat["in_bank_hdfc"]
+    assert flat["in_doc_cts"] and flat["in_doc_cts_v2"]
+    assert (flat["copy_page_start_0"], flat["copy_page_end_0"]) == (2, 3)
+    assert (flat["copy_page_start_1"], flat["copy_page_end_1"]) == (30, 31)
+
+
+def test_copies_of_stored_chunks_are_reported_not_stored():
+    idx = NearDuplicateIndex()
+    idx.add("old:1", minhash(CLAUSE))
+    canonical, stored_dupes, _ = dedup_documents([{"id": "new:1", "text": CLAUSE}], idx)
+    assert canonical == []
+    assert list(stored_dupes) == ["old:1"]
+
+
+def test_mmr_prefers_diverse_results():
+    q = np.array([1.0, 0.0])
+    cands = np.array([[1.0, 0.1], [1.0, 0.11], [0.7, 0.7]])
+    assert mmr_select(q, cands, 2, lambda_mult=1.0) == [0, 1]
+    assert mmr_select(q, cands, 2, lambda_mult=0.3) == [0, 2]
@@ -0,0 +1,49 @@
+import threading
+
+import numpy as np
+
+from rag_starterkit.rag.embeddings import PRIORITY_INGEST, PRIORITY_QUERY, EmbeddingService
+
+
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.busy = threading.Event()
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, normalize_embeddings=False):
+        self.busy.set()
+        self.gate.wait(5)
+        self.calls.append(list(texts))
+        return np.array([[float(len(t))] for t in texts])
+
+
+def test_requests_are_batched_and_results_routed_back():
+    model = RecordingModel()
+    svc = EmbeddingService(lambda: model, workers=1, max_batch=8, max_wait_ms=50)
+
+    blocker = svc.submit(["x"], PRIORITY_INGEST)  # occupies the worker
+    model.busy.wait(5)
+    futures = [svc.submit(["a" * n], PRIORITY_QUERY)[0] for n in range(1, 4)]
+    model.gate.set()
+
+    blocker[0].result(5)
+    assert [f.result(5)[0][0] for f in futures] == [1.0, 2.0, 3.0]
+    assert model.calls[1] == ["a", "aa", "aaa"]
+
+
+def test_queries_jump_ahead_of_ingest_and_large_requests_are_split():
+    model = RecordingModel()
+    svc = EmbeddingService(lambda: model, workers=1, max_batch=4, max_wait_ms=0)
+
+    blocker = svc.submit(["x"], PRIORITY_INGEST)
+    model.busy.wait(5)
+    ingest = svc.submit([f"i{k}" for k in range(10)], PRIORITY_INGEST)
+    query = svc.submit(["q"], PRIORITY_QUERY)
+    model.gate.set()
+
+    for f in blocker + ingest + query:
+        f.result(5)
+    assert len(ingest) == 3
+    assert model.calls[1] == ["q"]
+    assert svc.encode(["ab", "c"]).shape == (2, 1)
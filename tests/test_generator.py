@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+
+from rag_starterkit.core.config import Settings
+from rag_starterkit.llm.safety import LLM_UNAVAILABLE_MESSAGE
+from rag_starterkit.rag import generator
+
+CONTEXTS = [{"id": "sample_policy.txt", "text": "Refunds within 14 days."}]
+GOOD = {"groundedness": 0.9, "confidence": 0.9, "hallucination_risk": "low", "unsupported_points": []}
+
+
+def test_error_answers_skip_the_judge(monkeypatch):
+    judged = []
+
+    async def timeout(prompt):
+        raise httpx.ReadTimeout("slow")
+
+    async def judge(answer, contexts):
+        judged.append(answer)
+        return GOOD
+
+    monkeypatch.setattr(generator, "generate_llm_answer", timeout)
+    monkeypatch.setattr(generator, "judge_answer", judge)
+
+    answer, citations, quality = asyncio.run(generator.generate_answer("q", CONTEXTS, mode="skip_canned"))
+    assert answer == LLM_UNAVAILABLE_MESSAGE and quality is None and judged == []
+
+    asyncio.run(generator.generate_answer("q", CONTEXTS, mode="sequential"))
+    assert judged == [LLM_UNAVAILABLE_MESSAGE]
+
+
+def test_streaming_judges_each_sentence_and_keeps_worst_risk(monkeypatch):
+    judged = []
+
+    async def stream(prompt):
+        for piece in ["Refunds take ", "14 days. ", "Cash is ", "instant."]:
+            yield piece
+
+    async def judge(answer, contexts):
+        judged.append(answer)
+        return GOOD if "14 days" in answer else {**GOOD, "hallucination_risk": "high"}
+
+    monkeypatch.setattr(generator, "stream_llm_answer", stream)
+    monkeypatch.setattr(generator, "judge_answer", judge)
+
+    answer, _, quality = asyncio.run(generator.generate_answer("q", CONTEXTS, mode="streaming"))
+    assert judged == ["Refunds take 14 days.", "Cash is instant."]
+    assert quality.hallucination_risk == "high" and quality.rejected
+
+
+def test_streaming_cancels_pending_judges_when_the_stream_fails(monkeypatch):
+    cancelled = []
+
+    async def stream(prompt):
+        yield "Refunds take 14 days. "
+        await asyncio.sleep(0.01)
+        raise httpx.HTTPStatusError("boom", request=httpx.Request("POST", "http://x"), response=httpx.Response(500))
+
+    async def judge(answer, contexts):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(answer)
+            raise
+
+    monkeypatch.setattr(generator, "stream_llm_answer", stream)
+    monkeypatch.setattr(generator, "judge_answer", judge)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(generator.generate_answer("q", CONTEXTS, mode="streaming"))
+    assert cancelled == ["Refunds take 14 days."]
+
+
+def test_legacy_concurrent_judge_mode_is_accepted():
+    assert Settings(judge_mode="concurrent").judge_mode == "skip_canned"
+
+
+def test_streaming_empty_answer_is_returned_unjudged(monkeypatch):
+    async def stream(prompt):
+        for piece in ["", "  \n"]:
+            yield piece
+
+    async def judge(answer, contexts):
+        raise AssertionError("nothing to judge")
+
+    monkeypatch.setattr(generator, "stream_llm_answer", stream)
+    monkeypatch.setattr(generator, "judge_answer", judge)
+
+    answer, _, quality = asyncio.run(generator.generate_answer("q", CONTEXTS, mode="streaming"))
+    assert answer == "" and quality is None
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import httpx
+
+from rag_starterkit.core.metrics import counters
+from rag_starterkit.llm import ollama_client, qwen_judge
+from rag_starterkit.llm.judge_parser import JsonObjectExtractor, coerce_quality, extract_json_object
+
+
+def test_extracts_first_valid_object_around_prose_and_fences():
+    raw = 'Sure! {not json} Here you go:\n```json\n{"groundedness": 0.8, "note": "a } b"}\n```\n{"x": 1}'
+    assert extract_json_object(raw) == {"groundedness": 0.8, "note": "a } b"}
+    assert extract_json_object("no object here") is None
+
+
+def test_extractor_is_incremental():
+    ex = JsonObjectExtractor()
+    assert ex.feed('Result: {"groundedness": 0.') is None
+    assert ex.feed('9, "confidence": 1}') == {"groundedness": 0.9, "confidence": 1}
+
+
+def test_coerce_clamps_into_answer_quality_schema():
+    q = coerce_quality({"groundedness": "85%", "confidence": 7, "hallucination_risk": "LOW ",
+                        "unsupported_points": "one claim"})
+    assert q == {"groundedness": 0.85, "confidence": 0.7, "hallucination_risk": "low",
+                 "unsupported_points": ["one claim"]}
+    assert coerce_quality({"groundedness": 0.2, "hallucination_risk": "maybe"})["hallucination_risk"] == "high"
+    assert coerce_quality({"confidence": 0.9}) is None
+
+
+def test_coerce_reads_ten_point_scales_and_rejects_ambiguous_numbers():
+    assert coerce_quality({"groundedness": "7"})["groundedness"] == 0.7
+    assert coerce_quality({"groundedness": 7})["hallucination_risk"] == "medium"
+    assert coerce_quality({"groundedness": "8/10"})["groundedness"] == 0.8
+    assert coerce_quality({"groundedness": 1})["groundedness"] == 1.0
+    assert coerce_quality({"groundedness": 85}) is None  # no "%": scale unknown
+
+
+def test_judge_retries_only_unparseable_output():
+    replies = iter(["I think it is fine.", 'Verdict: {"groundedness": 1, "confidence": 0.9, '
+                                           '"hallucination_risk": "low", "unsupported_points": []}'])
+    payloads = []
+
+    def handler(request):
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": next(replies)})
+
+    async def run():
+        ollama_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        ollama_client._client_loop = asyncio.get_running_loop()
+        return await qwen_judge.judge_answer("answer", [{"text": "source"}])
+
+    before = counters.snapshot()
+    result = asyncio.run(run())
+    after = counters.snapshot()
+
+    assert result["hallucination_risk"] == "low" and len(payloads) == 2
+    assert payloads[0]["format"]["required"][0] == "groundedness"
+    assert after["judge_parse_failures"] - before.get("judge_parse_failures", 0) == 1
+    assert after["judge_retries"] - before.get("judge_retries", 0) == 1
@@ -0,0 +1,140 @@
+from rag_starterkit.rag.metadata_index import MetadataIndex, build_where, copy_metadata, flatten_metadata
+
+
+def _index():
+    idx = MetadataIndex()
+    metas = {
+        "a": {"doc_id": "p1", "bank": "sbi", "section_type": "policy", "policy_topic": "cts",
+              "concept_tags": ["CTS"], "page_start": 1, "page_end": 2},
+        "b": {"doc_id": "p1", "bank": "sbi", "section_type": "annexure",
+              "concept_tags": ["CTS", "PPS"], "page_start": 5, "page_end": 6},
+        "c": {"doc_id": "p2", "bank": "hdfc", "section_type": "policy",
+              "concept_tags": ["DISHONOUR"], "page_start": 3, "page_end": 3},
+    }
+    idx.add(list(metas), [flatten_metadata(k, v) for k, v in metas.items()])
+    return idx
+
+
+def test_flatten_metadata_is_chroma_safe():
+    m = flatten_metadata("x", {"title_path": ["A", "B"], "number_path": ["1", "1.2"],
+                               "concept_tags": ["PPS", "CTS"], "policy_topic": None})
+    assert m == {"source": "x", "title_path": "A > B", "number_path": "1|1.2",
+                 "concept_tags": "CTS,PPS", "tag_CTS": True, "tag_PPS": True}
+
+
+def test_candidates_intersect_fields_tags_and_pages():
+    idx = _index()
+    assert idx.candidates({"bank": "sbi"}) == {"a", "b"}
+    assert idx.candidates({"bank": "sbi", "concept_tags": ["PPS"]}) == {"b"}
+    assert idx.candidates({"page_from": 2, "page_to": 4}) == {"a", "c"}
+    assert idx.candidates({"bank": "hdfc", "section_type": "annexure"}) == set()
+
+
+def test_reindexing_an_id_replaces_old_postings():
+    idx = _index()
+    idx.add(["a"], [flatten_metadata("a", {"bank": "hdfc"})])
+    assert idx.candidates({"bank": "sbi"}) == {"b"}
+    assert "a" in idx.candidates({"bank": "hdfc"})
+
+
+def test_build_where():
+    assert build_where(None) is None
+    assert build_where({"bank": "sbi"}) == {"$or": [{"bank": "sbi"}, {"in_bank_sbi": True}]}
+    where = build_where({"doc_id": "p1", "concept_tags": ["CTS"], "page_from": 2})
+    doc_clause, tag_clause, page_clause = where["$and"]
+    assert doc_clause == {"$or": [{"doc_id": "p1"}, {"in_doc_p1": True}]}
+    assert tag_clause == {"tag_CTS": True}
+    assert page_clause["$or"][:2] == [{"page_end": {"$gte": 2}}, {"copy_page_end_0": {"$gte": 2}}]
+
+
+def test_copy_spans_are_merged_and_capped():
+    copies = [f"sbi|p1|{p}|{p}" for p in (1, 2, 40, *range(100, 200, 10))]
+    meta = copy_metadata(copies)
+    assert (meta["copy_page_start_0"], meta["copy_page_end_0"]) == (1, 2)
+    assert (meta["copy_page_start_7"], meta["copy_page_end_7"]) == (150, 190)
+    assert "copy_page_start_8" not in meta
+
+
+def test_vectors_are_held_only_when_enabled():
+    idx = MetadataIndex(keep_vectors=True)
+    idx.add(["a", "b"], [{"bank": "sbi"}, {"bank": "sbi"}], [[1.0, 0.0], [0.0, 1.0]])
+    assert idx.vectors(["b", "a"]).tolist() == [[0.0, 1.0], [1.0, 0.0]]
+    idx.add(["a"], [{"bank": "hdfc"}])  # re-added without a vector
+    assert idx.vectors(["a"]) is None
+    assert idx.candidates({"bank": "sbi"}) == {"b"}
+
+    plain = MetadataIndex()
+    plain.add(["a"], [{"bank": "sbi"}], [[1.0, 0.0]])
+    assert plain.vectors(["a"]) is None
+
+
+def _isolated_store(monkeypatch, tmp_path):
+    import chromadb
+
+    from rag_starterkit.rag import provenance, vectorstore
+    from rag_starterkit.rag.shards import ShardManager
+
+    client = chromadb.EphemeralClient()
+    for c in client.list_collections():
+        client.delete_collection(c if isinstance(c, str) else c.name)
+    monkeypatch.setattr(vectorstore, "_client", client)
+    monkeypatch.setattr(vectorstore, "_shards", ShardManager(client))
+    monkeypatch.setattr(provenance, "_store", provenance.ProvenanceStore(str(tmp_path)))
+    return client
+
+
+def test_filtered_search_paths_agree_with_chroma_where(monkeypatch, tmp_path):
+    import numpy as np
+
+    from rag_starterkit.core.config import override_settings
+    from rag_starterkit.rag import vectorstore
+
+    client = _isolated_store(monkeypatch, tmp_path)
+    rng = np.random.default_rng(0)
+    vecs = rng.normal(size=(60, 8)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    metas = [{"bank": ("sbi", "hdfc")[i % 2], "page_start": i, "page_end": i} for i in range(60)]
+    vectorstore.bulk_upsert([f"c{i}" for i in range(60)], ["t"] * 60, metas, vecs, tenant="f")
+    monkeypatch.setattr(vectorstore, "embed_query", lambda q: vecs[7])
+
+    filters = {"bank": "hdfc", "page_from": 10, "page_to": 40}
+    expected = client.get_collection("rag_docs__f").query(
+        query_embeddings=[vecs[7].tolist()], n_results=4, where=build_where(filters),
+    )["ids"][0]
+    for limit in (2000, 0):  # exact over in-memory vectors / Chroma restricted to candidate ids
+        with override_settings(prefilter_max_candidates=limit):
+            vectorstore._shards.get("f").index_loaded = False
+            hits = vectorstore.query_documents("q", top_k=4, filters=filters, tenant="f", mmr_lambda=1.0)
+        assert [h["id"] for h in hits] == expected
+
+
+def test_collapsed_copies_are_found_by_their_filters(monkeypatch, tmp_path):
+    import numpy as np
+
+    from rag_starterkit.core.config import override_settings
+    from rag_starterkit.rag import vectorstore
+
+    client = _isolated_store(monkeypatch, tmp_path)
+    monkeypatch.setattr(vectorstore, "embed_texts", lambda texts: np.ones((len(texts), 4), dtype=np.float32))
+    monkeypatch.setattr(vectorstore, "embed_query", lambda q: np.ones(4, dtype=np.float32))
+    clause = ("The paying bank shall return the dishonoured cheque along with a return memo "
+              "indicating the reason for dishonour within the clearing cycle prescribed by RBI.")
+
+    def ingest(doc_id, bank, page):
+        vectorstore.add_documents([{"id": doc_id, "text": clause, "metadata": {
+            "bank": bank, "doc_id": f"{bank}_cts", "page_start": page, "page_end": page}}], tenant="f")
+
+    ingest("sbi:1", "sbi", 2)
+    vectorstore.query_documents("q", top_k=1, filters={"bank": "sbi"}, tenant="f")  # index loaded
+    ingest("hdfc:1", "hdfc", 30)  # folded into the stored sbi:1
+    collection = client.get_collection("rag_docs__f")
+    assert collection.count() == 1
+
+    for filters in ({"bank": "hdfc"}, {"doc_id": "hdfc_cts"}, {"page_from": 25, "page_to": 35},
+                    {"bank": "sbi", "page_from": 30}):
+        assert collection.get(where=build_where(filters))["ids"] == ["sbi:1"]
+        for limit in (2000, 0):
+            with override_settings(prefilter_max_candidates=limit):
+                hits = vectorstore.query_documents("q", top_k=1, filters=filters, tenant="f")
+            assert [h["id"] for h in hits] == ["sbi:1"]
+    assert vectorstore.query_documents("q", top_k=1, filters={"page_from": 10, "page_to": 20}, tenant="f") == []
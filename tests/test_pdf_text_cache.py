@@ -0,0 +1,31 @@
+import fitz
+
+from rag_starterkit.data import pdf_text_cache
+from rag_starterkit.data.pdf_text_cache import PdfDocument, PdfTextCache
+
+
+def _make_pdf(path, n_pages):
+    doc = fitz.open()
+    for i in range(n_pages):
+        doc.new_page().insert_text((72, 72), f"Page {i + 1} body")
+    doc.save(str(path))
+    doc.close()
+
+
+def test_pages_extracted_lazily_once_and_shared_by_content_hash(tmp_path, monkeypatch):
+    pdf = tmp_path / "a.pdf"
+    _make_pdf(pdf, 5)
+    cache = PdfTextCache(str(tmp_path / "cache"))
+
+    with PdfDocument(str(pdf), cache) as doc:
+        first = list(doc.iter_pages(1, 2))
+    assert [n for n, _ in first] == [1, 2] and "Page 1 body" in first[0][1]
+    assert set(cache.get_pages(doc.file_hash, 1, 5)) == {1, 2}
+
+    # A copy of the same file is served from cache without opening the PDF
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(pdf.read_bytes())
+    monkeypatch.setattr(pdf_text_cache.fitz, "open", lambda p: (_ for _ in ()).throw(AssertionError))
+    with PdfDocument(str(copy), cache) as doc:
+        assert len(doc) == 5
+        assert [t for _, t in doc.iter_pages(1, 2)] == [t for _, t in first]
@@ -0,0 +1,46 @@
+from rag_starterkit.rag.provenance import ProvenanceStore, snippet_window
+
+
+def test_batched_lookup_and_mmap_text(tmp_path):
+    store = ProvenanceStore(str(tmp_path))
+    store.put("default", [
+        {"id": "p:1", "text": "Introduction text ₹ one.", "metadata": {
+            "doc_id": "p", "source_path": "p.pdf", "page_start": 1, "page_end": 2,
+            "title_path": ["Policy", "Introduction"]}},
+        {"id": "p:2", "text": "Charges for dishonour.", "metadata": {
+            "doc_id": "p", "source_path": "p.pdf", "page_start": 3, "page_end": 3}},
+    ])
+    store.put("hr", [{"id": "p:1", "text": "other tenant", "metadata": {"doc_id": "p"}}])
+
+    recs = store.lookup("default", ["p:1", "p:2", "missing"])
+    assert set(recs) == {"p:1", "p:2"}
+    assert recs["p:1"]["page_end"] == 2
+    assert recs["p:1"]["title_path"] == ["Policy", "Introduction"]
+    assert store.text(recs["p:1"]) == "Introduction text ₹ one."
+    assert store.text(recs["p:2"]) == "Charges for dishonour."
+    assert store.text(store.lookup("hr", ["p:1"])["p:1"]) == "other tenant"
+
+
+def test_snippet_window_centres_on_query_terms():
+    text = ("filler words " * 60) + "cheque dishonour charges are levied per instrument. " + ("tail " * 80)
+    snip = snippet_window(text, "What are the dishonour charges?", width=120)
+    assert "dishonour charges" in snip
+    assert len(snip) <= 122
+    assert snippet_window("short text", "anything") == "short text"
+
+
+def test_reingest_rewrites_instead_of_appending(tmp_path):
+    store = ProvenanceStore(str(tmp_path))
+    docs = [{"id": f"p:{i}", "text": f"Clause {i} text.", "metadata": {"doc_id": "p"}} for i in range(3)]
+    store.put("default", docs)
+    fname = store.lookup("default", ["p:0"])["p:0"]["text_file"]
+    size = (tmp_path / "text" / fname).stat().st_size
+
+    store.put("default", docs)
+    store.put("default", [{"id": "p:1", "text": "Clause 1 amended.", "metadata": {"doc_id": "p"}}])
+
+    assert (tmp_path / "text" / fname).stat().st_size == size + 3  # "amended" replaces "text"
+    recs = store.lookup("default", ["p:0", "p:1", "p:2"])
+    assert [store.text(recs[k]) for k in ("p:0", "p:1", "p:2")] == [
+        "Clause 0 text.", "Clause 1 amended.", "Clause 2 text."
+    ]
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from rag_starterkit.api import routes
+from rag_starterkit.core import config
+from rag_starterkit.core.concurrency import AdmissionController, Overloaded
+from rag_starterkit.main import app
+
+client = TestClient(app)
+
+
+def test_admission_rejects_beyond_concurrency_plus_queue():
+    async def scenario():
+        ctl = AdmissionController(max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with ctl:
+                await release.wait()
+
+        tasks = [asyncio.create_task(hold()) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert (ctl.active, ctl.waiting) == (1, 1)
+        with pytest.raises(Overloaded):
+            async with ctl:
+                pass
+        release.set()
+        await asyncio.gather(*tasks)
+        return ctl.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1 and stats["active"] == 0
+
+
+def test_query_deadline_returns_504_and_cancels_generation(monkeypatch):
+    cancelled = []
+
+    async def fake_retrieve(query, top_k=4, **kwargs):
+        return [{"id": "c1", "text": "ctx"}]
+
+    async def slow_generate(query, contexts):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(routes, "aretrieve_context", fake_retrieve)
+    monkeypatch.setattr(routes, "generate_answer", slow_generate)
+    monkeypatch.setattr(config, "_settings", config.get_settings().model_copy(update={"query_deadline_s": 0.05}))
+
+    r = client.post("/v1/query", json={"query": "test"})
+    assert r.status_code == 504
+    assert cancelled == [True]
+
+
+def test_query_overload_returns_429(monkeypatch):
+    async def fake_answer(req):
+        raise Overloaded()
+
+    monkeypatch.setattr(routes, "_answer", fake_answer)
+    r = client.post("/v1/query", json={"query": "test"})
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "1"
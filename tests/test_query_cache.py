@@ -0,0 +1,49 @@
+import threading
+
+import numpy as np
+
+from rag_starterkit.rag.query_cache import QueryEmbeddingCache, normalize_query
+
+
+def test_normalization_merges_trivial_variants():
+    assert normalize_query("  Refund\tPOLICY​ ") == "refund policy"
+    assert normalize_query("ＲＢＩ circular") == normalize_query("rbi Circular")
+
+
+def test_lru_hits_eviction_and_model_flush():
+    calls = []
+    cache = QueryEmbeddingCache(maxsize=2)
+
+    def compute(q):
+        calls.append(q)
+        return np.array([len(q)])
+
+    cache.get_or_compute("m1", "Refund  policy", compute)
+    cache.get_or_compute("m1", "refund policy", compute)
+    cache.get_or_compute("m1", "b", compute)
+    cache.get_or_compute("m1", "c", compute)  # evicts "refund policy"
+    cache.get_or_compute("m1", "refund policy", compute)
+    assert calls == ["refund policy", "b", "c", "refund policy"]
+    assert cache.stats()["hits"] == 1
+
+    cache.get_or_compute("m2", "c", compute)  # model change flushes
+    assert calls[-1] == "c" and cache.stats()["size"] == 1
+
+
+def test_concurrent_misses_are_coalesced():
+    gate, calls = threading.Event(), []
+    cache = QueryEmbeddingCache()
+
+    def compute(q):
+        calls.append(q)
+        gate.wait(5)
+        return np.array([1.0])
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=("m", "same query", compute))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+    assert calls == ["same query"]
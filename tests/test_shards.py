@@ -0,0 +1,49 @@
+import chromadb
+import pytest
+
+from rag_starterkit.rag.shards import ShardManager, collection_name
+
+
+def test_collection_name_routing():
+    assert collection_name(None) == "rag_docs"
+    assert collection_name("default") == "rag_docs"
+    assert collection_name("Finance") == "rag_docs__finance"
+    with pytest.raises(ValueError):
+        collection_name("../etc")
+
+
+def test_shard_manager_loads_on_demand_and_caps_resident_shards():
+    client = chromadb.EphemeralClient()
+    mgr = ShardManager(client, max_loaded=2)
+
+    assert mgr.get("hr") is None  # query-side lookup never creates
+    for t in ("hr", "finance", "logistics"):
+        mgr.get(t, create=True).collection.upsert(ids=[t], documents=[t], embeddings=[[0.0, 1.0]])
+
+    stats = {s["tenant"]: s for s in mgr.stats()}
+    assert {"hr", "finance", "logistics"} <= set(stats)
+    assert stats["hr"]["loaded"] is False  # least recently used was evicted
+    assert stats["logistics"]["count"] == 1
+
+    assert mgr.get("hr").collection.count() == 1  # reloads from disk
+    assert mgr.unload("hr") is True
+
+
+def test_tenant_names_are_case_insensitive():
+    mgr = ShardManager(chromadb.EphemeralClient())
+    assert mgr.get("Finance", create=True) is mgr.get("finance")
+    assert mgr.unload("FINANCE") is True
+
+
+def test_invalid_tenant_scopes_are_rejected_with_422():
+    from fastapi.testclient import TestClient
+
+    from rag_starterkit.main import app
+
+    client = TestClient(app)
+    for body in (
+        {"query": "q", "tenants": ["../etc"]},
+        {"query": "q", "tenant": "hr", "tenants": ["finance"]},
+    ):
+        assert client.post("/v1/query", json=body).status_code == 422
+    assert client.get("/v1/debug/retrieve", params={"q": "q", "tenant": "a b"}).status_code == 422
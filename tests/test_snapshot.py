@@ -0,0 +1,59 @@
+import chromadb
+import numpy as np
+import pytest
+
+from rag_starterkit.rag import provenance, snapshot, vectorstore
+from rag_starterkit.rag.shards import ShardManager
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    def fresh():
+        client = chromadb.EphemeralClient()
+        for c in client.list_collections():
+            client.delete_collection(c if isinstance(c, str) else c.name)
+        monkeypatch.setattr(vectorstore, "_client", client)
+        monkeypatch.setattr(vectorstore, "_shards", ShardManager(client))
+        return client
+
+    monkeypatch.setattr(provenance, "_store", provenance.ProvenanceStore(str(tmp_path / "prov")))
+    return fresh
+
+
+def test_export_import_roundtrip_without_embedding(store, monkeypatch, tmp_path):
+    store()
+    rng = np.random.default_rng(0)
+    vecs = rng.normal(size=(7, 8)).astype(np.float32)
+    ids = [f"c{i}" for i in range(7)]
+    texts = [f"chunk {i} — ünïcode" for i in range(7)]
+    metas = [{"doc_id": "d1", "page_start": i, "title_path": "A > B"} for i in range(7)]
+    vectorstore.bulk_upsert(ids, texts, metas, vecs, tenant="hr")
+
+    snap = tmp_path / "snap"
+    manifest = snapshot.export_snapshot(str(snap), part_rows=3)
+    assert manifest["dim"] == 8
+    assert [p["rows"] for p in manifest["tenants"]["hr"]["parts"]] == [3, 3, 1]
+
+    store()  # new, empty replica
+    monkeypatch.setattr(vectorstore, "embed_texts", lambda *a, **k: pytest.fail("re-embedded"))
+    assert snapshot.import_snapshot(str(snap)) == {"hr": 7}
+
+    res = vectorstore._shards.get("hr").collection.get(ids=["c3"], include=["documents", "metadatas", "embeddings"])
+    assert res["documents"] == [texts[3]]
+    assert res["metadatas"][0]["page_start"] == 3
+    np.testing.assert_allclose(res["embeddings"][0], vecs[3], rtol=1e-6)
+    assert provenance.get_provenance_store().lookup("hr", ["c3"])["c3"]["title_path"] == ["A", "B"]
+
+
+def test_import_rejects_corrupt_part(store, tmp_path):
+    store()
+    vectorstore.bulk_upsert(["a"], ["text"], [{}], np.ones((1, 4), dtype=np.float32), tenant="hr")
+    snap = tmp_path / "snap"
+    snapshot.export_snapshot(str(snap))
+
+    part = snap / "hr" / "part-00000.npz"
+    part.write_bytes(part.read_bytes()[:-10])
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.verify_snapshot(str(snap))
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.import_snapshot(str(snap))